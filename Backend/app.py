@@ -1,17 +1,26 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from pymongo import MongoClient
 from pymongo.server_api import ServerApi
+from bson.binary import Binary
 from dotenv import load_dotenv
 import os
 from urllib.parse import quote_plus
 import json
 import re
+import logging
+import numpy as np
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cachelib import SimpleCache
 
 # Import modular utilities
 from utils.llm import LLMProvider
 from utils.graph import GraphRAG
 from utils.embeddings import FireworksEmbeddings
+from utils.semantic_cache import SemanticCache, MongoSemanticCache
+from utils.conversation_store import ConversationStore
 
 # Load environment variables
 load_dotenv()
@@ -32,8 +41,9 @@ MONGO_URI = f"mongodb+srv://{user_name}:{password}@{os.getenv('MONGO_APP_NAME')}
 
 app = Flask(__name__)
 
-# Secret key for session
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+# Request-path logging; set LOG_LEVEL=DEBUG for per-request diagnostics
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(message)s')
+logger = logging.getLogger(__name__)
 
 # Get environment URLs with fallbacks
 development_url = os.getenv('DEVELOPMENT_URL', 'http://localhost:3000')
@@ -50,25 +60,27 @@ CORS(app, resources={
 })
 
 # ── MongoDB Connection ──
+# Small, warm pool sized for this single-process chatbot. Under Gunicorn the app is imported
+# after fork, so each worker owns its pool. Reachability is checked by /health, not at import.
 try:
-    client = MongoClient(MONGO_URI, server_api=ServerApi('1'))
-    client.admin.command('ping')
-    print("✅ Successfully connected to MongoDB!")
+    client = MongoClient(
+        MONGO_URI,
+        server_api=ServerApi('1'),
+        maxPoolSize=20,
+        minPoolSize=5,
+        maxConnecting=4,
+        maxIdleTimeMS=60000,
+        socketTimeoutMS=20000,
+        connectTimeoutMS=5000,
+        waitQueueTimeoutMS=2000,
+    )
+    print("✅ MongoDB client configured")
     
     db = client[os.getenv('MONGO_DB_NAME')]
     collection = db[os.getenv('MONGO_CL_NAME')]
     
     print(f"📊 Database: {db.name}")
     print(f"📁 Collection: {collection.name}")
-    
-    doc_count = collection.count_documents({})
-    print(f"📄 Documents: {doc_count}")
-    
-    if doc_count > 0:
-        sample_doc = collection.find_one()
-        if 'embedding' in sample_doc:
-            embedding = sample_doc['embedding']
-            print(f"📊 Embedding dimension: {len(embedding) if isinstance(embedding, list) else 'Unknown'}")
 except Exception as e:
     print(f"❌ MongoDB connection failed: {e}")
     client = None
@@ -77,11 +89,31 @@ except Exception as e:
 
 # ── Neo4j Connection ──
 graph_rag = GraphRAG()
-try:
-    res = graph_rag.query("MATCH (n) RETURN count(n) as count")
-    print(f"✅ Connected to Neo4j (Nodes: {res[0]['count'] if res else 0})")
-except Exception as e:
-    print(f"❌ Neo4j connection failed: {e}")
+
+def _startup_diagnostics():
+    """Log collection and graph stats without delaying the first request."""
+    if collection is not None:
+        try:
+            doc_count = collection.estimated_document_count()
+            print(f"📄 Documents: {doc_count}")
+            
+            if doc_count > 0:
+                sample_doc = collection.find_one()
+                if 'embedding' in sample_doc:
+                    embedding = sample_doc['embedding']
+                    if isinstance(embedding, Binary):
+                        embedding = embedding.as_vector().data
+                    print(f"📊 Embedding dimension: {len(embedding) if isinstance(embedding, list) else 'Unknown'}")
+        except Exception as e:
+            print(f"❌ MongoDB diagnostics failed: {e}")
+
+    try:
+        res = graph_rag.query("MATCH (n) RETURN count(n) as count")
+        print(f"✅ Connected to Neo4j (Nodes: {res[0]['count'] if res else 0})")
+    except Exception as e:
+        print(f"❌ Neo4j connection failed: {e}")
+
+threading.Thread(target=_startup_diagnostics, daemon=True).start()
 
 # ── LLM Provider ──
 LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'groq')
@@ -94,69 +126,401 @@ if LLM_PROVIDER:
         print(f"❌ Failed to initialize LLM provider: {e}")
         llm_provider = None
 
+# ── Embeddings ──
+# One instance per process so the underlying HTTP connection pool is reused across requests
+fireworks_embeddings = FireworksEmbeddings()
+
+# ── Semantic Response Cache ──
+# Reuses replies for near-duplicate standalone messages ("hi" / "hey", paraphrased questions).
+# With SEMANTIC_CACHE_COLLECTION set the cache lives in MongoDB and is shared by every instance.
+semantic_cache = SemanticCache(threshold=0.95, max_entries=1000)
+SEMANTIC_CACHE_COLLECTION = os.getenv('SEMANTIC_CACHE_COLLECTION')
+if SEMANTIC_CACHE_COLLECTION and db is not None:
+    try:
+        semantic_cache = MongoSemanticCache(
+            db[SEMANTIC_CACHE_COLLECTION],
+            index_name=os.getenv('SEMANTIC_CACHE_INDEX_NAME', 'semantic_cache_index'),
+            threshold=0.92,
+            ttl_seconds=3600,
+        )
+        print(f"✅ Semantic cache backed by MongoDB collection '{SEMANTIC_CACHE_COLLECTION}'")
+    except Exception as e:
+        print(f"❌ MongoDB semantic cache unavailable, using in-memory cache: {e}")
+
+# ── Retrieval Cache ──
+# Paraphrased queries (cosine ≥ 0.95) reuse the previous vector search results instead of
+# another $vectorSearch round-trip. Per process and in memory: results go stale at most
+# until the worker restarts after re-ingestion.
+retrieval_cache = SemanticCache(threshold=0.95, max_entries=1024)
+
+# ── Server-Side Conversation History ──
+# With CONVERSATION_COLLECTION set, turns are stored per session_id and clients may omit
+# conversation_history; requests that still send it keep working unchanged.
+conversation_store = None
+CONVERSATION_COLLECTION = os.getenv('CONVERSATION_COLLECTION')
+if CONVERSATION_COLLECTION and db is not None:
+    try:
+        conversation_store = ConversationStore(db[CONVERSATION_COLLECTION])
+        print(f"✅ Conversation history stored in MongoDB collection '{CONVERSATION_COLLECTION}'")
+    except Exception as e:
+        print(f"❌ Conversation store unavailable, relying on client history: {e}")
+
+# ── Per-Session Classification ──
+# Last classification per client session_id, reused for anaphoric follow-ups ("tell me more")
+last_classifications = SimpleCache(threshold=1000, default_timeout=1800)
+# Labels for history-free messages, keyed by a hash of the normalised text
+classification_cache = SimpleCache(threshold=4096, default_timeout=0)
+
+# ── Worker Pools ──
+# Runs independent network calls (classification, embeddings, graph) of one request concurrently.
+# A gevent worker serves GUNICORN_WORKER_CONNECTIONS requests at once (its threads are patched greenlets),
+# and each request has up to two calls in flight, so the pool is sized for that instead of queueing them.
+REQUEST_POOL_SIZE = 2 * int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '200'))
+executor = ThreadPoolExecutor(max_workers=REQUEST_POOL_SIZE, thread_name_prefix='request')
+# Fire-and-forget writes (semantic cache, conversation turns) never hold up the request-path pool
+background_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('BACKGROUND_POOL_SIZE', '8')), thread_name_prefix='background'
+)
+
+# ── Vector Search Tuning ──
+# ANN candidates per requested document: each one is a graph visit and a distance computation, so
+# larger values buy recall with latency. 10× sits at the low end of Atlas' recommended 10–20× range.
+VECTOR_NUM_CANDIDATES_MULT = int(os.getenv('VECTOR_NUM_CANDIDATES_MULT', '10'))
+# Optional floor on numCandidates for very small limits; 0 lets the multiplier alone decide
+VECTOR_NUM_CANDIDATES_MIN = int(os.getenv('VECTOR_NUM_CANDIDATES_MIN', '0'))
+# Optional relevance floor on Atlas' (1 + cosine) / 2 score; unset keeps every top-k result
+VECTOR_MIN_SCORE = float(os.getenv('VECTOR_MIN_SCORE')) if os.getenv('VECTOR_MIN_SCORE') else None
+MONGO_INDEX_NAME = os.getenv('MONGO_INDEX_NAME')
+MONGO_EMBEDDING_FIELD_NAME = os.getenv('MONGO_EMBEDDING_FIELD_NAME', 'embedding')
+
+# Static stages of the vector search pipeline, built once and shared by every query
+_VECTOR_SEARCH_PROJECT = {
+    "$project": {
+        "_id": 0,
+        "chunk_text": 1,
+        "source_type": 1,
+        "chunk_index": 1,
+        "metadata": 1,
+        "token_count": 1,
+        "score": {"$meta": "vectorSearchScore"},
+    }
+}
+
 # ── Helper Functions ──
 
+_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+_BULLET_RE = re.compile(r'\*(.*?)\n')
+
+# Short greetings/acknowledgements that never need the LLM classifier
+_CASUAL_RE = re.compile(r"^\s*(hi|hey|hello|lol|ok|thanks?|thank you|bye|yo|sup|what'?s up)\b.*$", re.I)
+_CONTEXT_HINTS = re.compile(r'\b(naisarg|his|him|he|skills?|projects?|experience|resume)\b', re.I)
+_FOLLOW_UP_RE = re.compile(r'\b(he|his|him|that|it|more|also)\b', re.I)
+
 def format_text(text: str) -> str:
     """Format markdown-style text for the UI."""
-    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-    text = re.sub(r'\*(.*?)\n', r'<ul><li>\1</li></ul>', text)
+    if '*' not in text:
+        return text
+    text = _BOLD_RE.sub(r'<b>\1</b>', text)
+    text = _BULLET_RE.sub(r'<ul><li>\1</li></ul>', text)
     return text
 
 def find_similar_documents(
     collection,
-    inp_document_embedding: list,
+    inp_document_embedding: np.ndarray,
     index_name: str,
     col_name: str,
     no_of_docs: int = 3,
-    query: dict = {},
+    query: dict = None,
+    num_candidates_multiplier: int = VECTOR_NUM_CANDIDATES_MULT,
+    min_candidates: int = VECTOR_NUM_CANDIDATES_MIN,
+    min_score: float = VECTOR_MIN_SCORE,
 ) -> list:
-    """Find similar documents using MongoDB Atlas Vector Search."""
+    """Find similar documents using MongoDB Atlas Vector Search.
+
+    `query` is applied as a $vectorSearch pre-filter, so its fields must be
+    indexed as `filter` fields in the Atlas Vector Search index.
+    """
     try:
-        print(f"🔍 Starting vector search...")
-        print(f"   - Index: {index_name}")
-        print(f"   - Field: {col_name}")
-        print(f"   - Embedding length: {len(inp_document_embedding)}")
+        # $vectorSearch rejects numCandidates below limit
+        num_candidates = max(no_of_docs, min_candidates, no_of_docs * num_candidates_multiplier)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 Starting vector search...")
+            logger.debug("   - Index: %s", index_name)
+            logger.debug("   - Field: %s", col_name)
+            logger.debug("   - Embedding length: %s", len(inp_document_embedding))
+            logger.debug("   - Candidates: %s", num_candidates)
         
+        vector_search = {
+            "index": index_name,
+            "path": col_name,
+            "queryVector": inp_document_embedding.tolist(),  # Atlas needs a BSON array
+            "numCandidates": num_candidates,
+            "limit": no_of_docs,
+        }
+        if query:
+            vector_search["filter"] = query
+
         pipeline = [
-            {
-                "$vectorSearch": {
-                    "index": index_name,
-                    "path": col_name,
-                    "queryVector": inp_document_embedding,
-                    "numCandidates": 100,
-                    "limit": no_of_docs,
-                }
-            },
-            {"$match": query},
-            {
-                "$project": {
-                    "chunk_text": 1,
-                    "source_type": 1,
-                    "chunk_index": 1,
-                    "metadata": 1,
-                    "token_count": 1,
-                    "score": {"$meta": "vectorSearchScore"},
-                }
-            },
+            {"$vectorSearch": vector_search},
+            {"$unset": col_name},  # Never ship the stored vectors back over the wire
+            _VECTOR_SEARCH_PROJECT,
+            {"$limit": no_of_docs},
         ]
+        if min_score is not None:
+            # Results arrive best-first, so this only trims the weak tail on the server
+            pipeline.append({"$match": {"score": {"$gte": min_score}}})
         
-        documents = collection.aggregate(pipeline)
-        result = list(documents)[:no_of_docs]
-        print(f"🔍 Vector search returned {len(result)} documents")
+        # $vectorSearch already caps results at `limit`; size the first batch to match
+        documents = collection.aggregate(pipeline, batchSize=no_of_docs)
+        result = list(documents)
+        logger.info("🔍 Vector search returned %s documents", len(result))
         
+        if not logger.isEnabledFor(logging.DEBUG):
+            return result
         if result:
             for i, doc in enumerate(result):
                 score = doc.get('score', 'N/A')
-                print(f"   - Document {i+1}: Score {score}")
+                logger.debug("   - Document %s: Score %s", i+1, score)
         else:
-            print("   - No documents found")
+            logger.debug("   - No documents found")
             
         return result
     except Exception as e:
-        print(f"❌ Vector search failed: {e}")
-        print(f"   Error type: {type(e).__name__}")
+        logger.error("❌ Vector search failed (%s): %s", type(e).__name__, e)
         return []
 
+# ── Prompt Instructions ──
+# Static text leads every prompt so provider-side prompt caching sees a stable prefix;
+# history, retrieved facts and the question are appended after it.
+_RAG_INSTRUCTIONS = """You are Naisarg's personal AI Assistant (his 'AI Buddy'). 
+Your goal is to answer questions about him based on the facts below.
+
+STRICT RESPONSE RULES:
+1. Aim for a response length of approximately 100-150 words.
+2. STRICT ADHERENCE TO FACTS: Do not assume industry types or role details not explicitly stated. 
+   - If the data says "Ex-Mu Sigma", simply state he worked there. Do NOT guess their business (e.g., "delivery company").
+3. NO PRIVACY INVASION: Do not guess his current location or status if the data is missing.
+4. NEVER mention "Based on the provided facts," or internal data sources.
+5. Tone: Helpful and Professional Personal Assistant.
+6. NO PIVOTING: If the question was casual/off-topic, DO NOT mention Naisarg's bio unless specifically asked."""
+
+_NO_CONTEXT_INSTRUCTIONS = """Answer naturally and briefly. Don't mention sources. If you don't have the info, say: "Unfortunately, I don't have information about this - you can reach out to Naisarg directly at naisarghalvadiya@gmail.com." """
+
+_CASUAL_INSTRUCTIONS = """Respond naturally as a helpful AI assistant. 
+- If the user asks an off-topic question (like movie/song info), answer it directly but DO NOT pivot to talking about Naisarg. 
+- Stay in the user's chosen context.
+- Keep it brief and friendly."""
+
+_GENERIC_INSTRUCTIONS = """Let them know politely you focus on questions about Naisarg. Be brief and natural."""
+
+# Full prompt templates, assembled once; only the per-request fields are filled in by str.format
+_RAG_PROMPT = _RAG_INSTRUCTIONS + """
+
+FACTS:
+{vector_context}
+{graph_context}
+
+Question: {question}
+Answer:"""
+
+_NO_CONTEXT_PROMPT = _NO_CONTEXT_INSTRUCTIONS + """
+
+Previous conversation:
+{history}
+
+Question: {question}"""
+
+_CASUAL_PROMPT = _CASUAL_INSTRUCTIONS + """
+
+Previous conversation:
+{history}
+
+User message: {message}"""
+
+_GENERIC_PROMPT = _GENERIC_INSTRUCTIONS + """
+
+Previous conversation:
+{history}
+
+User message: {message}"""
+
+def classify_message(message: str, conversation_history: str) -> str:
+    """Classify a chat message as context-specific or casual using the LLM."""
+    if len(message.split()) <= 4 and _CASUAL_RE.match(message) and not _CONTEXT_HINTS.search(message):
+        logger.info('⚡ Classification: casual (fast path)')
+        return 'casual'
+
+    # Without history the label depends only on the message, so repeats can skip the LLM
+    cache_key = None
+    if not conversation_history:
+        cache_key = hashlib.sha256(message.lower().strip().encode()).hexdigest()
+        cached = classification_cache.get(cache_key)
+        if cached is not None:
+            logger.info('⚡ Classification: %s (cached)', cached)
+            return cached
+
+    initial_prompt = f"""Classify this message:
+
+Previous conversation:
+{conversation_history}
+
+Current message: {message}
+
+Classify as:
+- 'context-specific' ONLY if the user is explicitly asking about Naisarg Halvadiya, his work, skills, projects, or education.
+- 'casual' for greetings, personal small talk, or off-topic questions (like songs, movies, etc.) that ARE NOT about Naisarg.
+
+Answer with just one word: """
+    
+    try:
+        if not llm_provider:
+            raise ValueError("LLM provider not initialized")
+        # The label is a single word, so a small model and a tiny output cap are enough
+        classification_response = llm_provider.generate_content(
+            initial_prompt, conversation_history,
+            model=llm_provider.classifier_model, max_tokens=8
+        )
+        classification = classification_response.lower()
+        logger.info('🤖 Classification: %s', classification)
+        if cache_key:
+            classification_cache.set(cache_key, classification)
+    except Exception as e:
+        logger.error("❌ Classification failed: %s", e)
+        classification = 'casual'
+    return classification
+
+_CLASSIFY_AND_REWRITE_PROMPT = """You route questions for Naisarg Halvadiya's portfolio assistant.
+
+Classify the current message:
+- 'context-specific' ONLY if the user is asking about Naisarg Halvadiya, his work, skills, projects, or education.
+- 'casual' for greetings, personal small talk, or off-topic questions that ARE NOT about Naisarg.
+
+If it is context-specific, rewrite it as a standalone search query about Naisarg that includes the
+necessary context from the conversation. Be specific. Otherwise repeat the message unchanged.
+
+Respond with a JSON object: {"classification": "...", "standalone_query": "..."}
+"""
+
+def classify_and_rewrite(message: str, conversation_history: str, known_classification: str = None) -> tuple:
+    """Classify a message and rewrite it as a standalone query in one JSON-mode LLM call."""
+    if len(conversation_history) <= 50:
+        # Nothing to resolve against, so only the label is needed
+        return known_classification or classify_message(message, conversation_history), message
+    if not known_classification and len(message.split()) <= 4 \
+            and _CASUAL_RE.match(message) and not _CONTEXT_HINTS.search(message):
+        logger.info('⚡ Classification: casual (fast path)')
+        return 'casual', message
+
+    # Static instructions first so the provider can reuse the cached prompt prefix
+    prompt = f"""{_CLASSIFY_AND_REWRITE_PROMPT}
+Previous conversation:
+{conversation_history}
+
+Current message: {message}"""
+    try:
+        if not llm_provider:
+            raise ValueError("LLM provider not initialized")
+        result = json.loads(llm_provider.generate_content(prompt, "", max_tokens=200, json_mode=True))
+        classification = known_classification or str(result.get('classification', 'casual')).lower()
+        standalone_query = str(result.get('standalone_query') or message).strip()
+        logger.info('🤖 Classification: %s', classification)
+        logger.info("🔄 Query rewritten: '%s' → '%s'", message, standalone_query)
+        return classification, standalone_query
+    except Exception as e:
+        logger.warning("⚠️  Classify + rewrite failed, using original query: %s", e)
+        return known_classification or classify_message(message, conversation_history), message
+
+def retrieve_documents(embedding: np.ndarray) -> list:
+    """Vector search for the query embedding, reusing results of near-duplicate queries."""
+    docs = retrieval_cache.lookup(embedding)
+    if docs is not None:
+        logger.info("⚡ Retrieval cache hit")
+        return docs
+    docs = find_similar_documents(
+        collection=collection,
+        inp_document_embedding=embedding,
+        index_name=MONGO_INDEX_NAME,
+        col_name=MONGO_EMBEDDING_FIELD_NAME,
+        no_of_docs=5
+    )
+    if docs:
+        retrieval_cache.add(embedding, docs)
+    return docs
+
+def retrieve_graph_facts(question: str) -> list:
+    """Generate a Cypher query for the question and return the matching graph facts."""
+    logger.debug("🕸️ Querying Knowledge Graph...")
+    try:
+        cypher = graph_rag.generate_cypher(question, llm_provider)
+        if not cypher:
+            return []
+        logger.debug("🔮 Generated Cypher: %s", cypher)
+        return graph_rag.query(cypher)
+    except Exception as e:
+        logger.error("❌ Graph retrieval failed: %s", e)
+        return []
+
+def stream_chat_response(prompt: str, conversation_history: str, on_complete=None):
+    """Yield the LLM response as Server-Sent Events, formatting text as soon as it is safe to.
+
+    `on_complete` receives the raw model text; formatting only applies to what the client sees.
+    """
+    buffer = ""
+    raw = []
+    try:
+        for chunk in llm_provider.stream_content(prompt, conversation_history):
+            raw.append(chunk)
+            buffer += chunk
+            # Markdown markers only span a line: hold back a partial line that contains '*'
+            cut = buffer.rfind('\n') + 1
+            if '*' not in buffer[cut:]:
+                cut = len(buffer)
+            if cut:
+                token = format_text(buffer[:cut])
+                buffer = buffer[cut:]
+                yield f"data: {json.dumps({'token': token})}\n\n"
+        if buffer:
+            token = format_text(buffer)
+            yield f"data: {json.dumps({'token': token})}\n\n"
+    except Exception as e:
+        logger.error("❌ LLM streaming failed: %s", e)
+        yield f"data: {json.dumps({'error': 'Sorry, I encountered an issue generating a response. Please try again.'})}\n\n"
+        return
+
+    if on_complete:
+        on_complete("".join(raw))
+    logger.info("✅ Response streamed successfully")
+    yield "data: [DONE]\n\n"
+
+# Keep proxies (nginx, Vercel) from buffering the stream and delaying the first token
+_SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+# ── Cache Warm-Up ──
+# Common first questions are embedded and retrieved in the background at startup, so the
+# first real request for them skips both the embedding call and the $vectorSearch.
+WARM_QUERIES_FILE = os.getenv('WARM_QUERIES_FILE', os.path.join(os.path.dirname(__file__), 'warm_queries.json'))
+
+def load_top_queries(path: str) -> list:
+    """Read a JSON list of common queries, or an empty list if the file is missing or invalid."""
+    try:
+        with open(path) as f:
+            return [q for q in json.load(f) if isinstance(q, str) and q.strip()]
+    except (OSError, ValueError) as e:
+        print(f"⚠️ No warm-up queries loaded from {path}: {e}")
+        return []
+
+def warm_caches(queries: list) -> None:
+    """Populate the embedding and retrieval caches for the given queries."""
+    warmed = 0
+    # One embeddings request for all of them, then one retrieval each
+    for embedding in fireworks_embeddings.generate_embeddings_batch(queries):
+        if embedding is not None and retrieve_documents(embedding):
+            warmed += 1
+    print(f"🔥 Warmed caches for {warmed}/{len(queries)} common queries")
+
+if collection is not None:
+    threading.Thread(target=lambda: warm_caches(load_top_queries(WARM_QUERIES_FILE)), daemon=True).start()
+
 # ── Routes ──
 
 @app.route('/health', methods=['GET'])
@@ -165,14 +529,14 @@ def health_check():
         if client is None:
             return jsonify({'status': 'error', 'message': 'MongoDB not connected'}), 500
             
-        client.admin.command('ping')
-        doc_count = collection.count_documents({}) if collection else 0
+        # The count itself round-trips to the server, so a separate ping is redundant
+        doc_count = collection.estimated_document_count() if collection is not None else 0
         
         return jsonify({
             'status': 'healthy',
             'mongodb': 'connected',
-            'database': db.name if db else 'N/A',
-            'collection': collection.name if collection else 'N/A',
+            'database': db.name if db is not None else 'N/A',
+            'collection': collection.name if collection is not None else 'N/A',
             'document_count': doc_count,
         })
     except Exception as e:
@@ -195,165 +559,139 @@ def chat():
         
         if not message:
             return jsonify({'response': 'Error: No message provided'}), 400
-        
-        print(f"💬 Received message: {message}")
-        print(f"📝 Session ID: {session_id}")
-        print(f"📜 Conversation history length: {len(conversation_history)} chars")
-        if conversation_history:
-            print(f"📜 Conversation preview: {conversation_history[:200]}...")
-        else:
-            print(f"⚠️  No conversation history provided!")
-
-        # ── 1. Classification ──
-        initial_prompt = f"""Classify this message:
-
-Previous conversation:
-{conversation_history}
-
-Current message: {message}
-
-Classify as:
-- 'context-specific' ONLY if the user is explicitly asking about Naisarg Halvadiya, his work, skills, projects, or education.
-- 'casual' for greetings, personal small talk, or off-topic questions (like songs, movies, etc.) that ARE NOT about Naisarg.
 
-Answer with just one word: """
+        has_session = session_id != 'default_session'
+        store_turns = conversation_store is not None and has_session
+        if store_turns and 'conversation_history' not in data:
+            conversation_history = conversation_store.history(session_id)
         
-        try:
-            if not llm_provider:
-                raise ValueError("LLM provider not initialized")
-            classification_response = llm_provider.generate_content(initial_prompt, conversation_history)
-            classification = classification_response.lower()
-            print(f'🤖 Classification: {classification}')
-        except Exception as e:
-            print(f"❌ Classification failed: {e}")
-            classification = 'casual'
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("💬 Received message: %s", message)
+            logger.debug("📝 Session ID: %s", session_id)
+            logger.debug("📜 Conversation history length: %s chars", len(conversation_history))
+            if conversation_history:
+                logger.debug("📜 Conversation preview: %s...", conversation_history[:200])
+            else:
+                logger.debug("⚠️  No conversation history provided!")
+
+        needs_rewrite = len(conversation_history) > 50
+        wants_stream = 'text/event-stream' in request.headers.get('Accept', '')
+
+        # ── Semantic Cache ──
+        # Only standalone messages are eligible: with history the same words can mean something else.
+        # They are embedded and looked up first, so a cache hit never pays for the classifier call.
+        message_embedding = None
+        if not conversation_history:
+            message_embedding = fireworks_embeddings.generate_embeddings(message)
+            cached_response = semantic_cache.lookup(message_embedding) if message_embedding is not None else None
+            if cached_response:
+                logger.info("⚡ Semantic cache hit")
+                if store_turns:
+                    background_executor.submit(conversation_store.append, session_id, message, cached_response)
+                cached_html = format_text(cached_response)
+                if wants_stream:
+                    return Response(
+                        f"data: {json.dumps({'token': cached_html})}\n\ndata: [DONE]\n\n",
+                        mimetype='text/event-stream', headers=_SSE_HEADERS
+                    )
+                return jsonify({'response': cached_html})
+
+        # ── 1. Classification + Embedding (concurrent) ──
+        known_classification = None
+        if has_session and _FOLLOW_UP_RE.search(message) \
+                and 'context-specific' in (last_classifications.get(session_id) or ''):
+            logger.info('⚡ Classification: context-specific (follow-up)')
+            known_classification = 'context-specific'
+        classification_future = executor.submit(
+            classify_and_rewrite, message, conversation_history, known_classification
+        )
+        # The raw message embedding is only useful if the query won't be rewritten
+        if message_embedding is None and conversation_history and not needs_rewrite:
+            message_embedding = fireworks_embeddings.generate_embeddings(message)
+
+        classification, standalone_query = classification_future.result()
+        if has_session:
+            last_classifications.set(session_id, classification)
         
         if 'context-specific' in classification:
-            print("🔍 Performing hybrid search...")
+            logger.info("🔍 Performing hybrid search...")
             
-            # ── 2. Query Rewriting with Conversation Context ──
-            standalone_query = message
-            if conversation_history and len(conversation_history) > 50:
-                try:
-                    summary_prompt = f"""Summarize this conversation in 1-2 sentences, focusing on what was discussed about Naisarg:
-
-{conversation_history}
-
-Summary:"""
-                    
-                    conversation_summary = llm_provider.generate_content(summary_prompt, "")
-                    print(f"📋 Conversation summary: {conversation_summary}")
-                    
-                    rewrite_prompt = f"""Context: {conversation_summary}
-
-User's question: "{message}"
-
-Rewrite this as a standalone search query about Naisarg that includes necessary context. Be specific.
-
-Standalone query:"""
-                    
-                    standalone_query = llm_provider.generate_content(rewrite_prompt, "")
-                    print(f"🔄 Query rewritten: '{message}' → '{standalone_query}'")
-                except Exception as e:
-                    print(f"⚠️  Query rewrite failed, using original: {e}")
-                    standalone_query = message
+            # ── 2. Query Rewriting ──
+            # Already done alongside classification in classify_and_rewrite
             
+            # Graph retrieval (Cypher generation + Neo4j) is independent of the vector path
+            graph_future = executor.submit(retrieve_graph_facts, standalone_query)
+
             # ── 3. Vector Retrieval ──
-            fireworks_embeddings = FireworksEmbeddings()
-            message_embedding = fireworks_embeddings.generate_embeddings(standalone_query)
+            if standalone_query != message or message_embedding is None:
+                message_embedding = fireworks_embeddings.generate_embeddings(standalone_query)
 
-            if not message_embedding:
-                print("❌ Failed to generate embeddings")
+            if message_embedding is None:
+                logger.error("❌ Failed to generate embeddings")
                 return jsonify({'response': 'Sorry, I encountered an issue processing your request.'}), 500
 
-            similar_docs = find_similar_documents(
-                collection=collection,
-                inp_document_embedding=message_embedding,
-                index_name=os.getenv('MONGO_INDEX_NAME'),
-                col_name=os.getenv('MONGO_EMBEDDING_FIELD_NAME'),
-                no_of_docs=5
-            )
+            similar_docs = retrieve_documents(message_embedding)
 
             # ── 4. Graph Retrieval ──
-            print("🕸️ Querying Knowledge Graph...")
-            graph = GraphRAG()
-            cypher = graph.generate_cypher(standalone_query, llm_provider)
-            graph_facts = []
-            if cypher:
-                print(f"🔮 Generated Cypher: {cypher}")
-                graph_facts = graph.query(cypher)
+            graph_facts = graph_future.result()
             
             # ── 5. Prepare Context ──
             vector_context = "\n".join([doc["chunk_text"] for doc in similar_docs if "chunk_text" in doc])
             graph_context = json.dumps(graph_facts, indent=2) if graph_facts else ""
 
             if not vector_context and not graph_context:
-                print("⚠️ No similar documents or graph facts found")
-                prompt = f"""Previous conversation:
-{conversation_history}
-
-Question: {message}
-
-Answer naturally and briefly. Don't mention sources. If you don't have the info, say: "Unfortunately, I don't have information about this - you can reach out to Naisarg directly at naisarghalvadiya@gmail.com." """
+                logger.warning("⚠️ No similar documents or graph facts found")
+                prompt = _NO_CONTEXT_PROMPT.format(history=conversation_history, question=message)
             else:
-                if graph_facts: print(f"✅ Found {len(graph_facts)} facts in Graph")
-                if similar_docs: print(f"📄 Retrieved {len(similar_docs)} relevant chunks from Vector")
+                if graph_facts: logger.info("✅ Found %s facts in Graph", len(graph_facts))
+                if similar_docs: logger.info("📄 Retrieved %s relevant chunks from Vector", len(similar_docs))
 
-                prompt = f"""You are Naisarg's personal AI Assistant (his 'AI Buddy'). 
-Your goal is to answer questions about him based on the facts below.
-
-FACTS:
-{vector_context}
-{graph_context}
-
-STRICT RESPONSE RULES:
-1. Aim for a response length of approximately 100-150 words.
-2. STRICT ADHERENCE TO FACTS: Do not assume industry types or role details not explicitly stated. 
-   - If the data says "Ex-Mu Sigma", simply state he worked there. Do NOT guess their business (e.g., "delivery company").
-3. NO PRIVACY INVASION: Do not guess his current location or status if the data is missing.
-4. NEVER mention "Based on the provided facts," or internal data sources.
-5. Tone: Helpful and Professional Personal Assistant.
-6. NO PIVOTING: If the question was casual/off-topic, DO NOT mention Naisarg's bio unless specifically asked.
-
-Question: {message}
-Answer:"""
+                prompt = _RAG_PROMPT.format(vector_context=vector_context, graph_context=graph_context, question=message)
 
         elif 'casual' in classification:
-            print('💭 Handling casual conversation')
-            prompt = f"""Previous conversation:
-{conversation_history}
-
-User message: {message}
-
-Respond naturally as a helpful AI assistant. 
-- If the user asks an off-topic question (like movie/song info), answer it directly but DO NOT pivot to talking about Naisarg. 
-- Stay in the user's chosen context.
-- Keep it brief and friendly. """
+            logger.info('💭 Handling casual conversation')
+            prompt = _CASUAL_PROMPT.format(history=conversation_history, message=message)
 
         else:
-            print('💭 Handling generic question')
-            prompt = f"""Previous conversation:
-{conversation_history}
-
-User message: {message}
-
-Let them know politely you focus on questions about Naisarg. Be brief and natural."""
+            logger.info('💭 Handling generic question')
+            prompt = _GENERIC_PROMPT.format(history=conversation_history, message=message)
 
         # ── 6. Generate Response ──
+        # Only casual/generic replies are cached: questions about different facts (skills vs projects) embed
+        # close enough to cross the similarity threshold, and RAG answers go stale when the corpus is re-ingested
+        cache_reply = not conversation_history and message_embedding is not None \
+            and 'context-specific' not in classification
+
+        def on_complete(text: str) -> None:
+            """Cache and record the finished (raw, unformatted) reply off the request path."""
+            if cache_reply:
+                background_executor.submit(semantic_cache.add, message_embedding, text, message)
+            if store_turns:
+                background_executor.submit(conversation_store.append, session_id, message, text)
+
+        # Clients that accept Server-Sent Events get tokens as they are generated
+        if llm_provider and wants_stream:
+            return Response(
+                stream_with_context(stream_chat_response(prompt, conversation_history, on_complete)),
+                mimetype='text/event-stream',
+                headers=_SSE_HEADERS
+            )
+
         try:
             if not llm_provider:
                 raise ValueError("LLM provider not initialized")
             response = llm_provider.generate_content(prompt, conversation_history)
-            response_text = format_text(response)
         except Exception as e:
-            print(f"❌ LLM API failed: {e}")
+            logger.error("❌ LLM API failed: %s", e)
             return jsonify({'response': 'Sorry, I encountered an issue generating a response. Please try again.'}), 500
 
-        print(f"✅ Response generated successfully")
-        return jsonify({'response': response_text})
+        on_complete(response)
+
+        logger.info("✅ Response generated successfully")
+        return jsonify({'response': format_text(response)})
     
     except Exception as e:
-        print(f"❌ Error in chat route: {e}")
+        logger.error("❌ Error in chat route: %s", e)
         return jsonify({'error': 'Internal server error', 'message': str(e)}), 500
 
 
@@ -0,0 +1,13 @@
+# Gunicorn settings for running the backend outside Vercel: `gunicorn app:app`
+# gevent workers yield on network I/O (LLM, embeddings, MongoDB, Neo4j), so a single
+# worker interleaves many in-flight /chat requests instead of blocking on each hop.
+# Gunicorn's gevent worker monkey-patches the stdlib before the app is imported.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+worker_class = 'gevent'
+# Concurrent requests per worker; each one is a greenlet parked on outbound I/O
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '200'))
+# Import the app after fork so every worker creates its own MongoClient connection pool
+preload_app = False
@@ -4,73 +4,128 @@ Test script for the Flask RAG Chatbot API
 Run this script to test your API endpoints
 """
 
+import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+try:
+    import orjson
+    dumps, loads = orjson.dumps, orjson.loads
+except ImportError:  # orjson is optional; stdlib json gives the same results, just slower
+    dumps, loads = (lambda obj: json.dumps(obj).encode()), json.loads
 import time
+import uuid
+from collections import deque
+
+# Lazy %-style logging: arguments are only formatted when the level is enabled
+log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 # Configuration
 BASE_URL = "http://localhost:5000"  # Change this to your server URL
 
+# One keep-alive connection pool for every request, so only the first pays the TCP/TLS handshake.
+# Transient gateway errors (e.g. a cold-starting serverless backend) are retried with backoff, for GET only:
+# a POST /chat may have been processed before the 5xx, and replaying it would duplicate the conversation turn.
+# Connection errors are still retried for every method, since the request never reached the server.
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({"GET"})),
+    pool_connections=4,
+    pool_maxsize=20,
+)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+SESSION.headers.update({"Content-Type": "application/json"})
+
+# One chat session per test run: turns share server-side session state, and parallel runs never collide
+SESSION_ID = uuid.uuid4().hex
+
+class TokenBucket:
+    """Allow short bursts up to `capacity`, then pace requests at `refill_per_sec`."""
+
+    def __init__(self, capacity=5, refill_per_sec=2.0):
+        self.capacity = capacity
+        self.rate = refill_per_sec
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+
+    def acquire(self):
+        """Take one token, sleeping only when the bucket is empty."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        if self.tokens < 1:
+            time.sleep((1 - self.tokens) / self.rate)
+            self.last_refill = time.monotonic()
+            self.tokens = 1
+        self.tokens -= 1
+
+# Keeps the chat tests inside the backend's LLM rate limits
+CHAT_RATE_LIMIT = TokenBucket(capacity=5, refill_per_sec=2.0)
+
 def test_health_endpoint():
     """Test the health check endpoint"""
-    print("🔍 Testing health endpoint...")
+    log.info("🔍 Testing health endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/health")
-        print(f"Status Code: {response.status_code}")
+        response = SESSION.get(f"{BASE_URL}/health")
+        log.info("Status Code: %s", response.status_code)
         if response.status_code == 200:
-            data = response.json()
-            print("✅ Health check passed!")
-            print(f"   MongoDB: {data['mongodb']['status']}")
-            print(f"   Gemini API: {data['gemini_api']['status']}")
-            print(f"   Documents: {data['mongodb']['document_count']}")
+            data = loads(response.content)
+            log.info("✅ Health check passed!")
+            log.info("   MongoDB: %s", data['mongodb'])
+            log.info("   Database: %s.%s", data['database'], data['collection'])
+            log.info("   Documents: %s", data['document_count'])
         else:
-            print("❌ Health check failed!")
-            print(f"Response: {response.text}")
+            log.error("❌ Health check failed!")
+            log.error("Response: %s", response.text)
     except Exception as e:
-        print(f"❌ Error testing health endpoint: {e}")
+        log.error("❌ Error testing health endpoint: %s", e)
 
 def test_config_endpoint():
     """Test the configuration endpoint"""
-    print("\n🔍 Testing config endpoint...")
+    log.info("\n🔍 Testing config endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/config")
-        print(f"Status Code: {response.status_code}")
+        response = SESSION.get(f"{BASE_URL}/config")
+        log.info("Status Code: %s", response.status_code)
         if response.status_code == 200:
-            data = response.json()
-            print("✅ Config endpoint working!")
-            print(f"   Environment: {data['environment']}")
-            print(f"   Chat Model: {data['chat_model']}")
+            data = loads(response.content)
+            log.info("✅ Config endpoint working!")
+            log.info("   Environment: %s", data['environment'])
+            log.info("   Chat Model: %s", data['chat_model'])
         else:
-            print("❌ Config endpoint failed!")
-            print(f"Response: {response.text}")
+            log.error("❌ Config endpoint failed!")
+            log.error("Response: %s", response.text)
     except Exception as e:
-        print(f"❌ Error testing config endpoint: {e}")
+        log.error("❌ Error testing config endpoint: %s", e)
 
 def test_debug_vector_search():
     """Test the vector search debug endpoint"""
-    print("\n🔍 Testing vector search debug endpoint...")
+    log.info("\n🔍 Testing vector search debug endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/debug-vector-search")
-        print(f"Status Code: {response.status_code}")
+        response = SESSION.get(f"{BASE_URL}/debug-vector-search")
+        log.info("Status Code: %s", response.status_code)
         if response.status_code == 200:
-            data = response.json()
+            data = loads(response.content)
             if data.get('success'):
-                print("✅ Vector search working!")
-                print(f"   Query: {data['query']}")
-                print(f"   Results: {data['results_count']}")
-                print(f"   Embedding length: {data['embedding_length']}")
+                log.info("✅ Vector search working!")
+                log.info("   Query: %s", data['query'])
+                log.info("   Results: %s", data['results_count'])
+                log.info("   Embedding length: %s", data['embedding_length'])
             else:
-                print("❌ Vector search failed!")
-                print(f"Error: {data.get('error')}")
+                log.error("❌ Vector search failed!")
+                log.error("Error: %s", data.get('error'))
         else:
-            print("❌ Vector search endpoint failed!")
-            print(f"Response: {response.text}")
+            log.error("❌ Vector search endpoint failed!")
+            log.error("Response: %s", response.text)
     except Exception as e:
-        print(f"❌ Error testing vector search: {e}")
+        log.error("❌ Error testing vector search: %s", e)
 
 def test_chat_endpoint():
     """Test the chat endpoint"""
-    print("\n🔍 Testing chat endpoint...")
+    log.info("\n🔍 Testing chat endpoint...")
     
     test_messages = [
         "What are Naisarg's skills?",
@@ -79,46 +134,48 @@ def test_chat_endpoint():
         "What's the weather like?"
     ]
     
+    # Turns of one conversation share a session and go out in order
+    history = deque(maxlen=8)  # Rolling window of the last 4 exchanges, in the backend's line format
     for i, message in enumerate(test_messages, 1):
-        print(f"\n   Test {i}: {message}")
+        log.info("\n   Test %s: %s", i, message)
+        CHAT_RATE_LIMIT.acquire()
         try:
             payload = {
                 "message": message,
-                "conversation_history": "",
-                "session_id": f"test_session_{i}"
+                "conversation_history": "\n".join(history),
+                "session_id": SESSION_ID
             }
             
-            response = requests.post(
-                f"{BASE_URL}/chat",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
+            # Content-Type is already set on the session; send the pre-serialised body as-is
+            response = SESSION.post(f"{BASE_URL}/chat", data=dumps(payload))
             
-            print(f"   Status Code: {response.status_code}")
+            log.info("   Status Code: %s", response.status_code)
             if response.status_code == 200:
-                data = response.json()
-                print(f"   ✅ Response: {data['response'][:100]}...")
+                data = loads(response.content)
+                log.info("   ✅ Response: %s...", data['response'][:100])
+                history.append(f"User: {message}")
+                history.append(f"Assistant: {data['response']}")
             else:
-                print(f"   ❌ Error: {response.text}")
+                log.error("   ❌ Error: %s", response.text)
                 
         except Exception as e:
-            print(f"   ❌ Error: {e}")
-        
-        # Small delay between requests
-        time.sleep(1)
+            log.error("   ❌ Error: %s", e)
 
 def main():
     """Run all tests"""
-    print("🚀 Starting API Tests...")
-    print("=" * 50)
+    log.info("🚀 Starting API Tests...")
+    log.info("=" * 50)
     
-    test_health_endpoint()
-    test_config_endpoint()
-    test_debug_vector_search()
-    test_chat_endpoint()
+    try:
+        test_health_endpoint()
+        test_config_endpoint()
+        test_debug_vector_search()
+        test_chat_endpoint()
+    finally:
+        SESSION.close()
     
-    print("\n" + "=" * 50)
-    print("🏁 Tests completed!")
+    log.info("\n" + "=" * 50)
+    log.info("🏁 Tests completed!")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
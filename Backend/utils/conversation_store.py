@@ -0,0 +1,48 @@
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+class ConversationStore:
+    """Server-side chat history keyed by the client's session_id.
+
+    Lets clients send only `{session_id, message}` instead of re-uploading the
+    whole conversation each turn. Sessions expire through a TTL index on `ts`.
+    """
+
+    def __init__(self, collection, max_turns: int = 20, ttl_seconds: int = 86400):
+        self.collection = collection
+        self.max_turns = max_turns
+        collection.create_index("session_id", unique=True)
+        collection.create_index("ts", expireAfterSeconds=ttl_seconds)
+
+    def history(self, session_id: str) -> str:
+        """Return the stored turns in the 'User: ' / 'Assistant: ' format the LLM layer parses."""
+        try:
+            doc = self.collection.find_one({"session_id": session_id}, {"_id": 0, "turns": 1})
+        except Exception as e:
+            logger.warning("⚠️ Conversation history load failed: %s", e)
+            return ""
+        if not doc:
+            return ""
+        labels = {"user": "User", "assistant": "Assistant"}
+        return "\n".join(f"{labels[t['role']]}: {t['content']}" for t in doc.get("turns", []))
+
+    def append(self, session_id: str, message: str, response: str) -> None:
+        """Append one user/assistant exchange, keeping only the newest max_turns messages."""
+        now = datetime.now(timezone.utc)
+        turns = [
+            {"role": "user", "content": message, "ts": now},
+            {"role": "assistant", "content": response, "ts": now},
+        ]
+        try:
+            self.collection.update_one(
+                {"session_id": session_id},
+                {
+                    "$push": {"turns": {"$each": turns, "$slice": -self.max_turns}},
+                    "$set": {"ts": now},
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning("⚠️ Conversation history save failed: %s", e)
@@ -1,43 +1,204 @@
 import os
+import logging
+import time
+import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import openai
 from google import genai
+from google.genai import types
+from cachelib import SimpleCache
+from utils.http_client import HTTP_CLIENT
+
+logger = logging.getLogger(__name__)
+
+def _as_vector(values) -> np.ndarray:
+    """Pack an API embedding into a read-only, unit-norm float32 array, safe to share from the cache.
+
+    Base64 payloads are the raw float32 bytes, so they are wrapped as-is instead of parsed value by value.
+    Stored chunk embeddings are unit-norm too, so cosine and dotProduct indexes give the same scores.
+    """
+    if isinstance(values, str):
+        vec = np.frombuffer(base64.b64decode(values), dtype="<f4")
+    else:
+        vec = np.asarray(values, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    if norm:
+        vec = vec / norm
+    vec.setflags(write=False)
+    return vec
+
+def _cache_key(model: str, text: str) -> str:
+    """Content-addressed cache key for an embedding of `text` by `model`."""
+    return hashlib.blake2b(f"{model}\0{text}".encode()).hexdigest()
+
+# Texts per embeddings request in generate_embeddings_batch, and how many of those requests run at once
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+EMBEDDING_CONCURRENCY = int(os.getenv('EMBEDDING_CONCURRENCY', '4'))
+EMBEDDING_RETRIES = 3  # Rate-limited (429 / RESOURCE_EXHAUSTED) attempts, with exponential backoff
+
+def _embed_split(raw_embed_batch, texts: list) -> list:
+    """Embed texts in one request, backing off when rate limited.
+
+    If the provider rejects the batch as too large (400/413), it is halved and each half retried.
+    """
+    for attempt in range(EMBEDDING_RETRIES + 1):
+        try:
+            return raw_embed_batch(texts)
+        except Exception as e:
+            status = getattr(e, 'status_code', None) or getattr(e, 'code', None)
+            if status == 429 and attempt < EMBEDDING_RETRIES:
+                time.sleep(0.5 * 2 ** attempt)
+                continue
+            if len(texts) == 1 or status not in (400, 413):
+                raise
+            mid = len(texts) // 2
+            return _embed_split(raw_embed_batch, texts[:mid]) + _embed_split(raw_embed_batch, texts[mid:])
+
+def _embed_batched(cache, keys: list, texts: list, raw_embed_batch, label: str) -> list:
+    """Serve cached vectors and embed the misses EMBEDDING_BATCH_SIZE at a time; None where a batch failed.
+
+    Up to EMBEDDING_CONCURRENCY batch requests are in flight at once (greenlets under the gevent worker).
+    """
+    results = [cache.get(key) for key in keys]
+    misses = [i for i, vec in enumerate(results) if vec is None]
+    batches = [misses[start:start + EMBEDDING_BATCH_SIZE] for start in range(0, len(misses), EMBEDDING_BATCH_SIZE)]
+
+    def embed(batch):
+        try:
+            return _embed_split(raw_embed_batch, [texts[i] for i in batch])
+        except Exception as e:
+            logger.error("❌ %s batch embeddings failed: %s", label, e)
+            return None
+
+    if len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=min(EMBEDDING_CONCURRENCY, len(batches))) as pool:
+            outcomes = list(pool.map(embed, batches))
+    else:
+        outcomes = list(map(embed, batches))
+
+    for batch, vectors in zip(batches, outcomes):
+        if vectors is None:
+            continue
+        for i, vec in zip(batch, vectors):
+            results[i] = vec
+            cache.set(keys[i], vec)
+    return results
 
 class FireworksEmbeddings:
+    _embedding_cache = SimpleCache(threshold=4096, default_timeout=0)  # Class-level — survives across requests
+
     def __init__(self) -> None:
+        api_key = os.getenv('FIREWORKS_API_KEY')
+        # Without a key the client can't be built; generate_embeddings reports the missing key
         self.client = openai.OpenAI(
-            api_key=os.getenv('FIREWORKS_API_KEY'),
-            base_url="https://api.fireworks.ai/inference/v1"
-        )
+            api_key=api_key,
+            base_url="https://api.fireworks.ai/inference/v1",
+            http_client=HTTP_CLIENT
+        ) if api_key else None
         self.model = "nomic-ai/nomic-embed-text-v1.5"
+        # Matryoshka truncation (e.g. 256); must match the dimensions of the stored corpus and index
+        dimensions = os.getenv('EMBEDDING_DIMENSIONS')
+        self.dimensions = int(dimensions) if dimensions else None
+
+    def _raw_embed(self, inp: str) -> np.ndarray:
+        """Call the Fireworks.ai embeddings API. Raises on failure so errors are never cached."""
+        kwargs = {"dimensions": self.dimensions} if self.dimensions else {}
+        response = self.client.embeddings.create(
+            model=self.model,
+            input=inp,
+            encoding_format="base64",
+            **kwargs
+        )
+        return _as_vector(response.data[0].embedding)
+
+    def _raw_embed_batch(self, texts: list) -> list:
+        """One Fireworks.ai request for many texts; vectors come back in input order. Raises on failure."""
+        kwargs = {"dimensions": self.dimensions} if self.dimensions else {}
+        response = self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            encoding_format="base64",
+            **kwargs
+        )
+        return [_as_vector(item.embedding) for item in sorted(response.data, key=lambda item: item.index)]
+
+    def generate_embeddings_batch(self, texts: list) -> list:
+        """Float32 embeddings for many texts, one request per EMBEDDING_BATCH_SIZE uncached texts; None on failure."""
+        if not os.getenv('FIREWORKS_API_KEY'):
+            logger.warning("⚠️ FIREWORKS_API_KEY not set")
+            return [None] * len(texts)
+
+        model_key = f"{self.model}:{self.dimensions or 'full'}"
+        keys = [_cache_key(model_key, text) for text in texts]
+        return _embed_batched(self._embedding_cache, keys, texts, self._raw_embed_batch, "Fireworks")
 
-    def generate_embeddings(self, inp: str) -> list:
-        """Generate embeddings for input text using Fireworks.ai."""
+    def generate_embeddings(self, inp: str) -> np.ndarray:
+        """Generate a float32 embedding for input text using Fireworks.ai, or None on failure."""
         if not os.getenv('FIREWORKS_API_KEY'):
-            print("⚠️ FIREWORKS_API_KEY not set")
-            return []
+            logger.warning("⚠️ FIREWORKS_API_KEY not set")
+            return None
+
+        key = _cache_key(f"{self.model}:{self.dimensions or 'full'}", inp)
+        cached = self._embedding_cache.get(key)
+        if cached is not None:
+            return cached
 
         try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=inp
-            )
-            return response.data[0].embedding
+            embedding = self._raw_embed(inp)
         except Exception as e:
-            print(f"❌ Fireworks Embeddings failed: {e}")
-            return []
+            logger.error("❌ Fireworks Embeddings failed: %s", e)
+            return None
+        self._embedding_cache.set(key, embedding)
+        return embedding
 
 class GoogleEmbeddings:
+    _embedding_cache = SimpleCache(threshold=4096, default_timeout=0)
+
     def __init__(self):
         self.client = genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
         self.model = "text-embedding-004"
+        # Same Matryoshka setting as FireworksEmbeddings: the API returns only the first N dimensions
+        # (not unit-norm; _as_vector re-normalizes)
+        dimensions = os.getenv('EMBEDDING_DIMENSIONS')
+        self.dimensions = int(dimensions) if dimensions else None
+        self.config = types.EmbedContentConfig(output_dimensionality=self.dimensions) if self.dimensions else None
+        self.model_key = f"{self.model}:{self.dimensions or 'full'}"
+
+    def _raw_embed(self, text):
+        """Call the Gemini embeddings API. Raises on failure so errors are never cached."""
+        response = self.client.models.embed_content(
+            model=self.model,
+            contents=text,
+            config=self.config
+        )
+        return _as_vector(response.embeddings[0].values)
+
+    def _raw_embed_batch(self, texts):
+        """One Gemini request for many texts; embeddings come back in input order. Raises on failure."""
+        response = self.client.models.embed_content(
+            model=self.model,
+            contents=texts,
+            config=self.config
+        )
+        return [_as_vector(embedding.values) for embedding in response.embeddings]
+
+    def generate_embeddings_batch(self, texts):
+        """Float32 embeddings for many texts, one request per EMBEDDING_BATCH_SIZE uncached texts; None on failure."""
+        keys = [_cache_key(self.model_key, text) for text in texts]
+        return _embed_batched(self._embedding_cache, keys, texts, self._raw_embed_batch, "Google")
 
     def generate_embeddings(self, text):
+        key = _cache_key(self.model_key, text)
+        cached = self._embedding_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.client.models.embed_content(
-                model=self.model,
-                contents=text
-            )
-            return response.embeddings[0].values
+            embedding = self._raw_embed(text)
         except Exception as e:
-            print(f"❌ Google Embeddings failed: {e}")
-            return []
+            logger.error("❌ Google Embeddings failed: %s", e)
+            return None
+        self._embedding_cache.set(key, embedding)
+        return embedding
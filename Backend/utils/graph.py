@@ -9,6 +9,7 @@ class GraphRAG:
         self.uri = os.getenv('NEO4J_URI')
         self.user = os.getenv('NEO4J_USER')
         self.password = os.getenv('NEO4J_PASSWORD')
+        self._driver = None
 
         # ── Few-shot examples for the LLM ──
         self.examples = """
@@ -41,12 +42,13 @@ Cypher: MATCH (p:Person)-[r:WORKED_AT]->(c:Company) WHERE toLower(p.name) CONTAI
 """
 
     def _get_driver(self):
-        """Create a new Neo4j driver instance."""
-        return GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+        """Return the Neo4j driver, creating it on first use so its connection pool is reused."""
+        if self._driver is None:
+            self._driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+        return self._driver
 
     def _fetch_schema(self):
         """Introspect the live Neo4j database for its actual schema."""
-        driver = None
         try:
             driver = self._get_driver()
             with driver.session() as session:
@@ -120,9 +122,6 @@ Cypher: MATCH (p:Person)-[r:WORKED_AT]->(c:Company) WHERE toLower(p.name) CONTAI
         except Exception as e:
             print(f"⚠️ Schema introspection failed, using fallback: {e}")
             return self._fallback_schema()
-        finally:
-            if driver:
-                driver.close()
 
     def _fallback_schema(self):
         """Static fallback schema in case introspection fails."""
@@ -248,15 +247,8 @@ Corrected Cypher:"""
         """Execute a Cypher query against Neo4j. Raises exception on syntax error."""
         if not all([self.uri, self.user, self.password, cypher]):
             return []
-        driver = None
-        try:
-            driver = self._get_driver()
-            with driver.session() as session:
-                result = session.run(cypher)
-                return [record.data() for record in result]
-        except Exception as e:
-            # Raise the exception so generate_cypher can catch it for correction
-            raise e
-        finally:
-            if driver:
-                driver.close()
+        # Exceptions propagate so generate_cypher can catch them for correction
+        driver = self._get_driver()
+        with driver.session() as session:
+            result = session.run(cypher)
+            return [record.data() for record in result]
@@ -0,0 +1,7 @@
+import httpx
+
+# One keep-alive connection pool shared by every OpenAI-compatible client (Groq, Fireworks)
+HTTP_CLIENT = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20)
+)
@@ -1,10 +1,70 @@
 import os
+import logging
+import hashlib
+import functools
+from collections import deque
 import openai
+import tiktoken
 from google import genai
+from cachelib import SimpleCache, FileSystemCache
+from utils.http_client import HTTP_CLIENT
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MAX_MESSAGES = 10
+HISTORY_MAX_TOKENS = int(os.getenv('HISTORY_MAX_TOKENS', '2000'))
+
+@functools.lru_cache(maxsize=1)
+def get_encoding():
+    """Load the tiktoken encoding once per process, or None if it can't be fetched."""
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"⚠️ tiktoken encoding unavailable, estimating token counts: {e}")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken, falling back to a ~4 chars/token estimate."""
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode_ordinary(text))
+
+SYSTEM_PROMPT = """You are Naisarg's personal AI Assistant. Answer questions naturally and helpfully.
+Key facts about Naisarg:
+- GitHub: https://github.com/nh0397
+- LinkedIn: https://www.linkedin.com/in/naisarg-h/
+- Email: naisarghalvadiya@gmail.com
+- Location: San Francisco, CA
+
+Style Guidelines:
+- Answer directly and warmly. 
+- Don't mention internal sources like "the provided facts" or "the vector database."
+"""
+
+# Shared by every request; never mutate
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+@functools.lru_cache(maxsize=256)
+def _parse_history(conversation_history: str) -> tuple:
+    """Parse 'User: '/'Assistant: ' lines once per distinct history string."""
+    messages = []
+    if not conversation_history:
+        return ()
+    
+    for line in conversation_history.strip().split('\n'):
+        line = line.strip()
+        if line.startswith('User: '):
+            messages.append({"role": "user", "content": line[6:]})
+        elif line.startswith('Assistant: '):
+            messages.append({"role": "assistant", "content": line[11:]})
+    
+    return tuple(messages)
 
 class LLMProvider:
     """Abstraction layer for different LLM providers"""
-    
+    _response_cache = None  # Class-level cache — shared by every provider instance
+
     def __init__(self, provider: str):
         self.provider = provider
         if provider == 'groq':
@@ -13,84 +73,152 @@ class LLMProvider:
                 raise ValueError("GROQ_API_KEY not set")
             self.client = openai.OpenAI(
                 api_key=api_key,
-                base_url="https://api.groq.com/openai/v1"
+                base_url="https://api.groq.com/openai/v1",
+                http_client=HTTP_CLIENT
             )
             self.model = os.getenv('GROQ_MODEL', 'mixtral-8x7b-32768')
+            self.classifier_model = os.getenv('GROQ_CLASSIFIER_MODEL', 'llama-3.1-8b-instant')
         elif provider == 'gemini':
             api_key = os.getenv('GOOGLE_API_KEY')
             if not api_key:
                 raise ValueError("GOOGLE_API_KEY not set")
             self.client = genai.Client(api_key=api_key)
             self.model = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+            self.classifier_model = os.getenv('GEMINI_CLASSIFIER_MODEL', 'gemini-1.5-flash-8b')
         else:
             raise ValueError(f"Unsupported provider: {provider}")
+
+        if os.getenv('ENABLE_LLM_CACHE') == '1' and LLMProvider._response_cache is None:
+            cache_dir = os.getenv('LLM_CACHE_DIR')
+            if cache_dir:
+                LLMProvider._response_cache = FileSystemCache(cache_dir, threshold=2048, default_timeout=3600)
+            else:
+                LLMProvider._response_cache = SimpleCache(threshold=2048, default_timeout=3600)
+
+    def _cache_key(self, prompt: str, conversation_history: str, model: str, max_tokens: int, json_mode: bool = False) -> str:
+        """Hash the provider, model, history and prompt into a fixed-size cache key."""
+        raw = "\0".join([self.provider, model, str(max_tokens), str(json_mode), conversation_history, prompt])
+        return hashlib.blake2b(raw.encode()).hexdigest()
     
-    def parse_conversation_history(self, conversation_history: str) -> list:
-        """Parse conversation history string into messages array for OpenAI-compatible APIs"""
-        messages = []
-        if not conversation_history:
-            return messages
+    def parse_conversation_history(self, conversation_history: str) -> tuple:
+        """Parse conversation history string into messages for OpenAI-compatible APIs"""
+        return _parse_history(conversation_history)
+
+    def recent_history(self, conversation_history: str) -> deque:
+        """Newest history messages that fit in HISTORY_MAX_MESSAGES and HISTORY_MAX_TOKENS"""
+        recent = deque()
+        budget = HISTORY_MAX_TOKENS
+        for message in reversed(self.parse_conversation_history(conversation_history)[-HISTORY_MAX_MESSAGES:]):
+            budget -= count_tokens(message["content"])
+            if budget < 0:
+                break
+            recent.appendleft(message)
+        return recent
+    
+    def generate_content(self, prompt: str, conversation_history: str = "", model: str = None,
+                         max_tokens: int = 1000, json_mode: bool = False) -> str:
+        """Generate content, serving repeated prompts from the response cache when enabled.
+
+        With json_mode the provider is constrained to return a single JSON object.
+        """
+        model = model or self.model
+        cache = LLMProvider._response_cache
+        if cache is None:
+            return self._generate_uncached(prompt, conversation_history, model, max_tokens, json_mode)
+
+        key = self._cache_key(prompt, conversation_history, model, max_tokens, json_mode)
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info("⚡ LLM cache hit")
+            return cached
+
+        response = self._generate_uncached(prompt, conversation_history, model, max_tokens, json_mode)
+        cache.set(key, response)
+        return response
+
+    def _build_messages(self, prompt: str, conversation_history: str) -> list:
+        """Build the OpenAI-compatible messages array for the groq provider"""
+        # Byte-identical system message first so provider-side prompt caching can reuse it
+        messages = [_SYSTEM_MESSAGE]
         
-        lines = conversation_history.strip().split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith('User: '):
-                messages.append({
-                    "role": "user",
-                    "content": line[6:]
-                })
-            elif line.startswith('Assistant: '):
-                messages.append({
-                    "role": "assistant",
-                    "content": line[11:]
-                })
+        if conversation_history:
+            messages.extend(self.recent_history(conversation_history))
         
+        messages.append({
+            "role": "user",
+            "content": prompt
+        })
         return messages
-    
-    def generate_content(self, prompt: str, conversation_history: str = "") -> str:
+
+    def _generate_uncached(self, prompt: str, conversation_history: str, model: str, max_tokens: int,
+                           json_mode: bool = False) -> str:
         """Generate content using the configured provider"""
         try:
             if self.provider == 'groq':
-                messages = []
-                # Add system message for context
-                messages.append({
-                    "role": "system",
-                    "content": """You are Naisarg's personal AI Assistant. Answer questions naturally and helpfully.
-Key facts about Naisarg:
-- GitHub: https://github.com/nh0397
-- LinkedIn: https://www.linkedin.com/in/naisarg-h/
-- Email: naisarghalvadiya@gmail.com
-- Location: San Francisco, CA
-
-Style Guidelines:
-- Answer directly and warmly. 
-- Don't mention internal sources like "the provided facts" or "the vector database."
-"""
-                })
-                
-                if conversation_history:
-                    history_messages = self.parse_conversation_history(conversation_history)
-                    messages.extend(history_messages[-10:])
-                
-                messages.append({
-                    "role": "user",
-                    "content": prompt
-                })
-                
+                extra = {"response_format": {"type": "json_object"}} if json_mode else {}
                 response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
+                    model=model,
+                    messages=self._build_messages(prompt, conversation_history),
                     temperature=0.5,
-                    max_tokens=1000
+                    max_tokens=max_tokens,
+                    **extra
                 )
                 return response.choices[0].message.content.strip()
             
             elif self.provider == 'gemini':
+                config = {"max_output_tokens": max_tokens}
+                if json_mode:
+                    config["response_mime_type"] = "application/json"
                 response = self.client.models.generate_content(
-                    model=self.model,
-                    contents=prompt
+                    model=model,
+                    contents=prompt,
+                    config=config
                 )
                 return response.text.strip()
         except Exception as e:
-            print(f"❌ {self.provider.upper()} API error: {e}")
+            logger.error("❌ %s API error: %s", self.provider.upper(), e)
             raise
+
+    def stream_content(self, prompt: str, conversation_history: str = "", model: str = None, max_tokens: int = 1000):
+        """Yield response text chunks as they are generated, replaying cached responses in one chunk"""
+        model = model or self.model
+        cache = LLMProvider._response_cache
+        key = self._cache_key(prompt, conversation_history, model, max_tokens)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info("⚡ LLM cache hit")
+                yield cached
+                return
+
+        parts = []
+        try:
+            if self.provider == 'groq':
+                stream = self.client.chat.completions.create(
+                    model=model,
+                    messages=self._build_messages(prompt, conversation_history),
+                    temperature=0.5,
+                    max_tokens=max_tokens,
+                    stream=True
+                )
+                for event in stream:
+                    delta = event.choices[0].delta.content if event.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+
+            elif self.provider == 'gemini':
+                for chunk in self.client.models.generate_content_stream(
+                    model=model,
+                    contents=prompt,
+                    config={"max_output_tokens": max_tokens}
+                ):
+                    if chunk.text:
+                        parts.append(chunk.text)
+                        yield chunk.text
+        except Exception as e:
+            logger.error("❌ %s API error: %s", self.provider.upper(), e)
+            raise
+
+        if cache is not None:
+            cache.set(key, "".join(parts).strip())
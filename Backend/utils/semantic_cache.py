@@ -0,0 +1,108 @@
+import threading
+import logging
+from datetime import datetime, timezone
+import numpy as np
+from bson.binary import Binary, BinaryVectorDtype
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """In-memory cache that reuses responses for near-duplicate queries."""
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embeddings = None  # (max_entries, D) matrix of unit-norm query embeddings
+        self._responses = []
+        self._next = 0  # Oldest slot, overwritten first once the cache is full
+        self._lock = threading.Lock()
+
+    def _normalize(self, embedding):
+        """Convert an embedding to a unit-norm float32 vector, or None if unusable."""
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        if vec.ndim != 1 or norm == 0:
+            return None
+        return vec / norm
+
+    def lookup(self, embedding):
+        """Return the cached response for the most similar query above the threshold."""
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+        with self._lock:
+            if not self._responses or self._embeddings.shape[1] != query.shape[0]:
+                return None
+            sims = self._embeddings[:len(self._responses)] @ query
+            best = int(np.argmax(sims))
+            if sims[best] > self.threshold:
+                return self._responses[best]
+        return None
+
+    def add(self, embedding, response: str, query: str = None) -> None:
+        """Store a response, evicting the oldest entry once the cache is full."""
+        query = self._normalize(embedding)
+        if query is None:
+            return
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.empty((self.max_entries, query.shape[0]), dtype=np.float32)
+            elif self._embeddings.shape[1] != query.shape[0]:
+                return
+            if len(self._responses) < self.max_entries:
+                self._embeddings[len(self._responses)] = query
+                self._responses.append(response)
+            else:
+                self._embeddings[self._next] = query
+                self._responses[self._next] = response
+                self._next = (self._next + 1) % self.max_entries
+
+class MongoSemanticCache:
+    """Semantic cache persisted in MongoDB, shared by every worker and instance.
+
+    Needs an Atlas Vector Search index on the collection's `embedding` field.
+    Entries expire through a TTL index on `ts`.
+    """
+
+    def __init__(self, collection, index_name: str, threshold: float = 0.92, ttl_seconds: int = 3600):
+        self.collection = collection
+        self.index_name = index_name
+        # Atlas reports cosine similarity as (1 + cos) / 2
+        self.min_score = (1 + threshold) / 2
+        collection.create_index("ts", expireAfterSeconds=ttl_seconds)
+
+    def lookup(self, embedding):
+        """Return the cached response for the nearest query if it is similar enough."""
+        pipeline = [
+            {
+                "$vectorSearch": {
+                    "index": self.index_name,
+                    "path": "embedding",
+                    "queryVector": np.asarray(embedding, dtype=np.float32).tolist(),
+                    "numCandidates": 20,
+                    "limit": 1,
+                }
+            },
+            {"$project": {"_id": 0, "response": 1, "score": {"$meta": "vectorSearchScore"}}},
+        ]
+        try:
+            docs = list(self.collection.aggregate(pipeline))
+        except Exception as e:
+            logger.warning("⚠️ Semantic cache lookup failed: %s", e)
+            return None
+        if docs and docs[0]["score"] >= self.min_score:
+            return docs[0]["response"]
+        return None
+
+    def add(self, embedding, response: str, query: str = None) -> None:
+        """Store a response for the query embedding."""
+        try:
+            self.collection.insert_one({
+                "query": query,
+                # BSON float32 vector: 4 bytes per value, indexed by Atlas like an array of doubles
+                "embedding": Binary.from_vector(np.asarray(embedding, dtype=np.float32).tolist(), BinaryVectorDtype.FLOAT32),
+                "response": response,
+                "ts": datetime.now(timezone.utc),
+            })
+        except Exception as e:
+            logger.warning("⚠️ Semantic cache insert failed: %s", e)
@@ -3,27 +3,66 @@ Configuration file for sliding window chunking parameters.
 Adjust these values based on your specific use case and requirements.
 """
 
+import os
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from chunking.text_chunker import (
+    SlidingWindowChunker,
+    get_encoder as _get_encoder,
+    encode_cached as _encode_cached,
+)
+
+# Token limits of the models chunks are sized for; chunks larger than this would be truncated
+_MODEL_MAX_TOKENS = {
+    "gpt-3.5-turbo": 8191,
+    "text-embedding-3-small": 8191,
+    "nomic-ai/nomic-embed-text-v1.5": 8192,
+}
+
 # Chunking Parameters
-CHUNKING_CONFIG = {
+@dataclass(frozen=True, slots=True)
+class ChunkingConfig:
+    """Immutable chunking settings; use update_chunking_config() to change them."""
     # Token-based chunking parameters
-    "chunk_size": 512,           # Maximum tokens per chunk
-    "overlap_size": 50,          # Tokens to overlap between adjacent chunks
+    chunk_size: int = 512            # Maximum tokens per chunk
+    overlap_size: int = 50           # Tokens to overlap between adjacent chunks
     
     # Model configuration for token counting
-    "model_name": "gpt-3.5-turbo",  # Used for tiktoken tokenizer
+    model_name: str = "gpt-3.5-turbo"  # Used for tiktoken tokenizer
     
     # Retrieval parameters
-    "max_chunks_per_query": 5,   # Maximum number of chunks to retrieve per query
-    "min_chunk_score": 0.7,      # Minimum similarity score for chunk retrieval
+    max_chunks_per_query: int = 5    # Maximum number of chunks to retrieve per query
+    min_chunk_score: float = 0.7     # Minimum similarity score for chunk retrieval
     
-    # Rate limiting for API calls
-    "embedding_delay": 1,        # Seconds to wait between embedding API calls
+    # Batching and rate limiting for embedding API calls
+    embedding_batch_size: int = 128  # Chunks sent per embeddings request
+    embedding_delay: float = 0.2     # Seconds between the starts of embedding batch requests
+    embedding_concurrency: int = 4   # Embedding batch requests in flight at once
     
     # Chunk metadata settings
-    "include_section_metadata": True,    # Include section identification in metadata
-    "include_source_metadata": True,     # Include source type in metadata
-    "include_chunk_index": True,         # Include chunk index in metadata
-}
+    include_section_metadata: bool = True  # Include section identification in metadata
+    include_source_metadata: bool = True   # Include source type in metadata
+    include_chunk_index: bool = True       # Include chunk index in metadata
+
+    def __post_init__(self):
+        max_tokens = _MODEL_MAX_TOKENS.get(self.model_name, 512)
+        if not 0 < self.chunk_size <= max_tokens:
+            raise ValueError(f"chunk_size must be between 1 and {max_tokens} for {self.model_name}, got {self.chunk_size}")
+        if not 0 <= self.overlap_size < self.chunk_size // 2:
+            raise ValueError(
+                f"overlap_size must be below half of chunk_size ({self.chunk_size}), got {self.overlap_size}"
+            )
+
+# CHUNK_SIZE / OVERLAP_SIZE override the defaults; bigger chunks mean fewer embedding calls
+_DEFAULTS = ChunkingConfig()
+CHUNKING_CONFIG = replace(
+    _DEFAULTS,
+    chunk_size=min(
+        int(os.getenv("CHUNK_SIZE", _DEFAULTS.chunk_size)),
+        _MODEL_MAX_TOKENS.get(_DEFAULTS.model_name, 512),
+    ),
+    overlap_size=int(os.getenv("OVERLAP_SIZE", _DEFAULTS.overlap_size)),
+)
 
 # Section identification keywords for metadata
 SECTION_KEYWORDS = {
@@ -48,54 +87,70 @@ SECTION_KEYWORDS = {
     }
 }
 
+# Normalise to lowercase frozensets once so lookups are hashed and nothing can mutate them
+SECTION_KEYWORDS = MappingProxyType({
+    source: MappingProxyType({section: frozenset(k.lower() for k in keywords) for section, keywords in sections.items()})
+    for source, sections in SECTION_KEYWORDS.items()
+})
+
 # Chunking strategies - you can switch between these
 CHUNKING_STRATEGIES = {
     "sliding_window": {
-        "class": "SlidingWindowChunker",
+        "class": SlidingWindowChunker,  # Resolved at import: get_current_strategy()["class"](...) is a direct call
         "description": "Fixed-size chunks with overlapping content",
         "pros": ["Maintains context", "Consistent chunk sizes", "Good for most use cases"],
         "cons": ["May split sentences", "Fixed size regardless of content"]
     },
     
     "semantic_chunking": {
-        "class": "SemanticChunker",  # Would need to implement
+        "class": None,  # SemanticChunker — would need to implement
         "description": "Chunks based on semantic boundaries",
         "pros": ["Respects content structure", "Better semantic coherence"],
         "cons": ["Variable chunk sizes", "More complex implementation"]
     },
     
     "hierarchical_chunking": {
-        "class": "HierarchicalChunker",  # Would need to implement
+        "class": None,  # HierarchicalChunker — would need to implement
         "description": "Multiple granularity levels",
         "pros": ["Flexible retrieval", "Multiple detail levels"],
         "cons": ["Complex storage", "More processing overhead"]
     }
 }
 
-# Current strategy (can be changed)
+# Current strategy (can be changed with set_chunking_strategy)
 CURRENT_STRATEGY = "sliding_window"
+_CURRENT_STRATEGY_CONFIG = CHUNKING_STRATEGIES[CURRENT_STRATEGY]  # Resolved on change, not on every read
+_AVAILABLE_STRATEGIES = tuple(CHUNKING_STRATEGIES)
+
+def get_encoder(model_name=None):
+    """Load the tiktoken encoder for a model (default: the configured one) once per process."""
+    return _get_encoder(model_name or CHUNKING_CONFIG.model_name)
+
+def encode_cached(text, model_name=None):
+    """Token ids for text; repeated fragments (overlaps, headers) are encoded once."""
+    return _encode_cached(text, model_name or CHUNKING_CONFIG.model_name)
 
 def get_chunking_config():
-    """Get the current chunking configuration."""
-    return CHUNKING_CONFIG.copy()
+    """Get the current chunking configuration (immutable, so no copy is needed)."""
+    return CHUNKING_CONFIG
 
 def get_section_keywords():
-    """Get section identification keywords."""
-    return SECTION_KEYWORDS.copy()
+    """Get section identification keywords (read-only, so no copy is needed)."""
+    return SECTION_KEYWORDS
 
 def get_current_strategy():
     """Get the current chunking strategy configuration."""
-    return CHUNKING_STRATEGIES[CURRENT_STRATEGY]
+    return _CURRENT_STRATEGY_CONFIG
 
 def update_chunking_config(**kwargs):
-    """Update chunking configuration parameters."""
+    """Update chunking configuration parameters by swapping in a new validated config."""
     global CHUNKING_CONFIG
-    CHUNKING_CONFIG.update(kwargs)
+    CHUNKING_CONFIG = replace(CHUNKING_CONFIG, **kwargs)
 
 def set_chunking_strategy(strategy_name):
     """Set the current chunking strategy."""
-    global CURRENT_STRATEGY
-    if strategy_name in CHUNKING_STRATEGIES:
-        CURRENT_STRATEGY = strategy_name
-    else:
-        raise ValueError(f"Unknown strategy: {strategy_name}. Available: {list(CHUNKING_STRATEGIES.keys())}")
+    global CURRENT_STRATEGY, _CURRENT_STRATEGY_CONFIG
+    if strategy_name not in CHUNKING_STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy_name}. Available: {list(_AVAILABLE_STRATEGIES)}")
+    CURRENT_STRATEGY = strategy_name
+    _CURRENT_STRATEGY_CONFIG = CHUNKING_STRATEGIES[strategy_name]
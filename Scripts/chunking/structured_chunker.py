@@ -8,8 +8,43 @@ instead of converting to text and splitting arbitrarily. This provides:
 - More granular retrieval (one item per chunk)
 """
 
+import hashlib
 import json
-from typing import List, Dict, Any
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+try:
+    import orjson
+    _dumps = lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:  # orjson is optional; stdlib json gives the same output, just slower
+    _dumps = lambda obj: json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+@dataclass(frozen=True, slots=True)
+class Chunk:
+    """One embeddable unit; use to_dict() for the stored MongoDB document shape."""
+    chunk_type: str
+    content: Any  # The item dict, or the section's own value (e.g. the skills list) for single chunks
+    chunk_text: str
+    source_type: str
+    section: str
+    item_index: Optional[int] = None  # Position within its section, for per-item chunks only
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the chunk as the dict stored in MongoDB (no item_index key on section-level chunks)."""
+        doc = {
+            "chunk_type": self.chunk_type,
+            "content": self.content,
+            "chunk_text": self.chunk_text,
+            "source_type": self.source_type,
+            "section": self.section,
+        }
+        if self.item_index is not None:
+            doc["item_index"] = self.item_index
+        return doc
 
 
 class StructuredChunker:
@@ -18,16 +53,91 @@ class StructuredChunker:
     Uses HYBRID approach: individual chunks + summary chunks for better context.
     """
     
-    def __init__(self, include_summaries: bool = True):
+    CACHE_SIZE = 32          # Distinct source inputs remembered per chunker
+    PARALLEL_THRESHOLD = 32  # Sections at least this long are formatted on the thread pool
+    
+    def __init__(self, include_summaries: bool = True, enable_parallel: bool = False):
         """
         Initialize the structured chunker.
         
         Args:
             include_summaries: If True, creates summary chunks in addition to individual chunks
+            enable_parallel: If True, format the items of large sections on a small thread pool.
+                Pure-Python formatting holds the GIL, so this only pays off for formatters that
+                do I/O (e.g. fetching README snippets); off by default.
         """
         self.include_summaries = include_summaries
+        self.enable_parallel = enable_parallel
+        self._executor: Optional[ThreadPoolExecutor] = None  # Created on first large section
+        # Content hash -> chunks, so re-ingesting an unchanged source skips all formatting
+        self._cache: "OrderedDict[str, List[Chunk]]" = OrderedDict()
+    
+    @staticmethod
+    def serialize(chunks: Iterable[Chunk]) -> bytes:
+        """Encode chunks as JSON Lines (one to_dict() document per line) in a single pass."""
+        return b"\n".join(_dumps(chunk.to_dict()) for chunk in chunks)
+    
+    def _memoized(self, source_type: str, data: Dict) -> List[Chunk]:
+        """Return cached chunks for identical input, materialising _iter_chunks() on a miss."""
+        canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+        key = hashlib.blake2b(f"{source_type}:{canonical}".encode(), digest_size=16).hexdigest()
+        chunks = self._cache.get(key)
+        if chunks is None:
+            chunks = self._cache[key] = list(self._iter_chunks(source_type, data))
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return list(chunks)  # Chunks are frozen, so the cached ones can be handed out as-is
+    
+    # Section layout per source, in emission order. Entry kinds:
+    #   ("basic",  fields, chunk_type, section, formatter)
+    #   ("items",  key, chunk_type, section, formatter,
+    #              summary_chunk_type, summary_section, summary_formatter, summary_line, all_key, total_key)
+    # summary_line formats one numbered summary line per item, or None when the summary is not line-based
+    #   ("single", key, chunk_type, section, formatter)
+    _SPECS = {
+        "resume": (
+            ("basic", ("full_name", "email_address", "linkedin_url"), "resume_basic_info", "basic_info", "_format_basic_info"),
+            ("items", "work_experience", "resume_work_experience", "work_experience", "_format_work_experience",
+             "resume_work_experience_summary", "work_experience_summary", "_format_work_experience_summary", "_work_experience_summary_line",
+             "all_experiences", "total_experiences"),
+            ("items", "projects", "resume_project", "projects", "_format_project",
+             "resume_projects_summary", "projects_summary", "_format_projects_summary", "_project_summary_line",
+             "all_projects", "total_projects"),
+            ("single", "skills", "resume_skills", "skills", "_format_skills"),
+            ("single", "certifications", "resume_certifications", "certifications", "_format_certifications"),
+        ),
+        "linkedin": (
+            ("basic", ("full_name", "headline", "location"), "linkedin_basic_info", "basic_info", "_format_linkedin_basic_info"),
+            ("items", "work_experience", "linkedin_work_experience", "work_experience", "_format_work_experience",
+             "linkedin_work_experience_summary", "work_experience_summary", "_format_work_experience_summary", "_work_experience_summary_line",
+             "all_experiences", "total_experiences"),
+            ("items", "education", "linkedin_education", "education", "_format_education",
+             "linkedin_education_summary", "education_summary", "_format_education_summary", "_education_summary_line",
+             "all_education", "total_degrees"),
+            ("single", "skills", "linkedin_skills", "skills", "_format_skills"),
+            ("items", "certifications", "linkedin_certification", "certifications", "_format_certification",
+             "linkedin_certifications_summary", "certifications_summary", "_format_certifications_summary", "_certification_summary_line",
+             "all_certifications", "total_certifications"),
+            ("items", "honors_and_awards", "linkedin_honor_award", "honors_awards", "_format_award",
+             "linkedin_honors_awards_summary", "honors_awards_summary", "_format_awards_summary", "_award_summary_line",
+             "all_awards", "total_awards"),
+        ),
+        "github": (
+            ("items", "repositories", "github_repository", "repositories", "_format_repository",
+             "github_repositories_summary", "repositories_summary", "_format_repositories_summary", None,
+             "all_repositories", "total_repositories"),
+        ),
+    }
+    # Interned, so every chunk shares one str object per chunk_type/section value and
+    # downstream equality checks on these fields short-circuit on identity
+    _SPECS = {
+        sys.intern(source): tuple(tuple(sys.intern(f) if isinstance(f, str) else f for f in entry) for entry in entries)
+        for source, entries in _SPECS.items()
+    }
     
-    def chunk_resume(self, resume_data: Dict) -> List[Dict]:
+    def chunk_resume(self, resume_data: Dict) -> List[Chunk]:
         """
         Chunk resume data into semantic units with hybrid approach.
         
@@ -36,353 +146,151 @@ class StructuredChunker:
         - Summary chunks for all work experiences, all projects
         - Skills and certifications chunks
         """
-        chunks = []
-        
-        # Chunk 1: Basic Information
-        if any(resume_data.get(k) for k in ['full_name', 'email_address', 'linkedin_url']):
-            basic_info = {
-                "chunk_type": "resume_basic_info",
-                "content": {
-                    "full_name": resume_data.get('full_name', ''),
-                    "email_address": resume_data.get('email_address', ''),
-                    "linkedin_url": resume_data.get('linkedin_url', '')
-                },
-                "chunk_text": self._format_basic_info(resume_data),
-                "source_type": "resume",
-                "section": "basic_info"
-            }
-            chunks.append(basic_info)
-        
-        # Individual chunks per work experience
-        for idx, exp in enumerate(resume_data.get('work_experience', [])):
-            work_chunk = {
-                "chunk_type": "resume_work_experience",
-                "content": exp,
-                "chunk_text": self._format_work_experience(exp),
-                "source_type": "resume",
-                "section": "work_experience",
-                "item_index": idx
-            }
-            chunks.append(work_chunk)
-        
-        # SUMMARY: All work experiences combined
-        if self.include_summaries and resume_data.get('work_experience'):
-            work_summary = {
-                "chunk_type": "resume_work_experience_summary",
-                "content": {
-                    "all_experiences": resume_data['work_experience'],
-                    "total_experiences": len(resume_data['work_experience'])
-                },
-                "chunk_text": self._format_work_experience_summary(resume_data['work_experience']),
-                "source_type": "resume",
-                "section": "work_experience_summary"
-            }
-            chunks.append(work_summary)
-        
-        # Individual chunks per project
-        for idx, project in enumerate(resume_data.get('projects', [])):
-            project_chunk = {
-                "chunk_type": "resume_project",
-                "content": project,
-                "chunk_text": self._format_project(project),
-                "source_type": "resume",
-                "section": "projects",
-                "item_index": idx
-            }
-            chunks.append(project_chunk)
-        
-        # SUMMARY: All projects combined
-        if self.include_summaries and resume_data.get('projects'):
-            projects_summary = {
-                "chunk_type": "resume_projects_summary",
-                "content": {
-                    "all_projects": resume_data['projects'],
-                    "total_projects": len(resume_data['projects'])
-                },
-                "chunk_text": self._format_projects_summary(resume_data['projects']),
-                "source_type": "resume",
-                "section": "projects_summary"
-            }
-            chunks.append(projects_summary)
-        
-        # Single chunk for all skills
-        if resume_data.get('skills'):
-            skills_chunk = {
-                "chunk_type": "resume_skills",
-                "content": {"skills": resume_data['skills']},
-                "chunk_text": self._format_skills(resume_data['skills']),
-                "source_type": "resume",
-                "section": "skills"
-            }
-            chunks.append(skills_chunk)
-        
-        # Single chunk for certifications (if any)
-        if resume_data.get('certifications'):
-            cert_chunk = {
-                "chunk_type": "resume_certifications",
-                "content": {"certifications": resume_data['certifications']},
-                "chunk_text": self._format_certifications(resume_data['certifications']),
-                "source_type": "resume",
-                "section": "certifications"
-            }
-            chunks.append(cert_chunk)
-        
-        return chunks
+        return self._memoized("resume", resume_data)
     
-    def chunk_linkedin(self, linkedin_data: Dict) -> List[Dict]:
+    def chunk_linkedin(self, linkedin_data: Dict) -> List[Chunk]:
         """
         Chunk LinkedIn data into semantic units with hybrid approach.
         
         Returns individual chunks + summary chunks for better context.
         """
-        chunks = []
-        
-        # Chunk 1: Basic Profile Information
-        if any(linkedin_data.get(k) for k in ['full_name', 'headline', 'location']):
-            basic_info = {
-                "chunk_type": "linkedin_basic_info",
-                "content": {
-                    "full_name": linkedin_data.get('full_name', ''),
-                    "headline": linkedin_data.get('headline', ''),
-                    "location": linkedin_data.get('location', '')
-                },
-                "chunk_text": self._format_linkedin_basic_info(linkedin_data),
-                "source_type": "linkedin",
-                "section": "basic_info"
-            }
-            chunks.append(basic_info)
-        
-        # Individual chunks per work experience
-        for idx, exp in enumerate(linkedin_data.get('work_experience', [])):
-            work_chunk = {
-                "chunk_type": "linkedin_work_experience",
-                "content": exp,
-                "chunk_text": self._format_work_experience(exp),
-                "source_type": "linkedin",
-                "section": "work_experience",
-                "item_index": idx
-            }
-            chunks.append(work_chunk)
-        
-        # SUMMARY: All work experiences combined
-        if self.include_summaries and linkedin_data.get('work_experience'):
-            work_summary = {
-                "chunk_type": "linkedin_work_experience_summary",
-                "content": {
-                    "all_experiences": linkedin_data['work_experience'],
-                    "total_experiences": len(linkedin_data['work_experience'])
-                },
-                "chunk_text": self._format_work_experience_summary(linkedin_data['work_experience']),
-                "source_type": "linkedin",
-                "section": "work_experience_summary"
-            }
-            chunks.append(work_summary)
-        
-        # Individual chunks per education
-        for idx, edu in enumerate(linkedin_data.get('education', [])):
-            edu_chunk = {
-                "chunk_type": "linkedin_education",
-                "content": edu,
-                "chunk_text": self._format_education(edu),
-                "source_type": "linkedin",
-                "section": "education",
-                "item_index": idx
-            }
-            chunks.append(edu_chunk)
-        
-        # SUMMARY: All education combined
-        if self.include_summaries and linkedin_data.get('education'):
-            edu_summary = {
-                "chunk_type": "linkedin_education_summary",
-                "content": {
-                    "all_education": linkedin_data['education'],
-                    "total_degrees": len(linkedin_data['education'])
-                },
-                "chunk_text": self._format_education_summary(linkedin_data['education']),
-                "source_type": "linkedin",
-                "section": "education_summary"
-            }
-            chunks.append(edu_summary)
-        
-        # Single chunk for all skills
-        if linkedin_data.get('skills'):
-            skills_chunk = {
-                "chunk_type": "linkedin_skills",
-                "content": {"skills": linkedin_data['skills']},
-                "chunk_text": self._format_skills(linkedin_data['skills']),
-                "source_type": "linkedin",
-                "section": "skills"
-            }
-            chunks.append(skills_chunk)
-        
-        # Individual chunks per certification
-        for idx, cert in enumerate(linkedin_data.get('certifications', [])):
-            cert_chunk = {
-                "chunk_type": "linkedin_certification",
-                "content": cert,
-                "chunk_text": self._format_certification(cert),
-                "source_type": "linkedin",
-                "section": "certifications",
-                "item_index": idx
-            }
-            chunks.append(cert_chunk)
-        
-        # SUMMARY: All certifications combined
-        if self.include_summaries and linkedin_data.get('certifications'):
-            cert_summary = {
-                "chunk_type": "linkedin_certifications_summary",
-                "content": {
-                    "all_certifications": linkedin_data['certifications'],
-                    "total_certifications": len(linkedin_data['certifications'])
-                },
-                "chunk_text": self._format_certifications_summary(linkedin_data['certifications']),
-                "source_type": "linkedin",
-                "section": "certifications_summary"
-            }
-            chunks.append(cert_summary)
-        
-        # Individual chunks per honor/award
-        for idx, award in enumerate(linkedin_data.get('honors_and_awards', [])):
-            award_chunk = {
-                "chunk_type": "linkedin_honor_award",
-                "content": award,
-                "chunk_text": self._format_award(award),
-                "source_type": "linkedin",
-                "section": "honors_awards",
-                "item_index": idx
-            }
-            chunks.append(award_chunk)
-        
-        # SUMMARY: All honors and awards combined
-        if self.include_summaries and linkedin_data.get('honors_and_awards'):
-            awards_summary = {
-                "chunk_type": "linkedin_honors_awards_summary",
-                "content": {
-                    "all_awards": linkedin_data['honors_and_awards'],
-                    "total_awards": len(linkedin_data['honors_and_awards'])
-                },
-                "chunk_text": self._format_awards_summary(linkedin_data['honors_and_awards']),
-                "source_type": "linkedin",
-                "section": "honors_awards_summary"
-            }
-            chunks.append(awards_summary)
-        
-        return chunks
+        return self._memoized("linkedin", linkedin_data)
     
-    def chunk_github(self, github_data: Dict) -> List[Dict]:
+    def chunk_github(self, github_data: Dict) -> List[Chunk]:
         """
         Chunk GitHub data into semantic units with hybrid approach.
         
         Returns individual repo chunks + summary chunk for portfolio overview.
         """
-        chunks = []
-        
-        # Individual chunks per repository
-        for idx, repo in enumerate(github_data.get('repositories', [])):
-            repo_chunk = {
-                "chunk_type": "github_repository",
-                "content": repo,
-                "chunk_text": self._format_repository(repo),
-                "source_type": "github",
-                "section": "repositories",
-                "item_index": idx
-            }
-            chunks.append(repo_chunk)
-        
-        # SUMMARY: All repositories overview
-        if self.include_summaries and github_data.get('repositories'):
-            repos_summary = {
-                "chunk_type": "github_repositories_summary",
-                "content": {
-                    "all_repositories": github_data['repositories'],
-                    "total_repositories": len(github_data['repositories'])
-                },
-                "chunk_text": self._format_repositories_summary(github_data['repositories']),
-                "source_type": "github",
-                "section": "repositories_summary"
-            }
-            chunks.append(repos_summary)
-        
-        return chunks
+        return self._memoized("github", github_data)
+    
+    def _iter_chunks(self, source_type: str, data: Dict) -> Iterator[Chunk]:
+        """Yield one source's chunks one at a time by walking its _SPECS entry (uncached)."""
+        for kind, key, chunk_type, section, formatter, *summary in self._SPECS[source_type]:
+            formatter = getattr(self, formatter)
+        
+            if kind == "basic":
+                # `key` holds the basic-info field names
+                if any(data.get(k) for k in key):
+                    yield Chunk(
+                        chunk_type=chunk_type,
+                        content={k: data.get(k, '') for k in key},
+                        chunk_text=formatter(data),
+                        source_type=source_type,
+                        section=section
+                    )
+        
+            elif kind == "single":
+                # The section's value is the content itself (e.g. the skills list), not re-wrapped as {key: value}
+                value = data.get(key)
+                if value:
+                    yield Chunk(
+                        chunk_type=chunk_type,
+                        content=value,
+                        chunk_text=formatter(value),
+                        source_type=source_type,
+                        section=section
+                    )
+        
+            else:
+                # Look the section up once; one read-only tuple feeds the item chunks and the summary content
+                items = tuple(data.get(key) or ())
+                summary_chunk_type, summary_section, summary_formatter, summary_line, all_key, total_key = summary
+                summarise = self.include_summaries and items
+        
+                # One pass: each item yields its chunk and, when summarising, its numbered summary line
+                line = getattr(self, summary_line) if summarise and summary_line else None
+                lines = []
+                for idx, (item, text) in enumerate(zip(items, self._format_items(formatter, items))):
+                    yield Chunk(
+                        chunk_type=chunk_type,
+                        content=item,
+                        chunk_text=text,
+                        source_type=source_type,
+                        section=section,
+                        item_index=idx
+                    )
+                    if line:
+                        lines.append(line(idx + 1, item))
+        
+                if summarise:
+                    n = len(items)
+                    summary_formatter = getattr(self, summary_formatter)
+                    yield Chunk(
+                        chunk_type=summary_chunk_type,
+                        content={
+                            all_key: items,
+                            total_key: n
+                        },
+                        chunk_text=summary_formatter(items, n, lines) if line else summary_formatter(items, n),
+                        source_type=source_type,
+                        section=summary_section
+                    )
+    
+    def _format_items(self, formatter, items: Sequence[Any]) -> Iterable[str]:
+        """Format every item of a section, in order; on the thread pool when enabled and the section is large."""
+        if not self.enable_parallel or len(items) < self.PARALLEL_THRESHOLD:
+            return map(formatter, items)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4)
+        return self._executor.map(formatter, items)
     
     # Formatting methods for chunk_text (used for embeddings)
     
-    def _format_basic_info(self, data: Dict) -> str:
+    def _format_basic_info(self, data: Dict[str, Any]) -> str:
         """Format basic resume info as readable text."""
-        parts = []
-        if data.get('full_name'):
-            parts.append(f"Name: {data['full_name']}")
-        if data.get('email_address'):
-            parts.append(f"Email: {data['email_address']}")
-        if data.get('linkedin_url'):
-            parts.append(f"LinkedIn: {data['linkedin_url']}")
-        return ". ".join(parts) + "."
-    
-    def _format_linkedin_basic_info(self, data: Dict) -> str:
+        fields = (("Name", data.get('full_name')), ("Email", data.get('email_address')), ("LinkedIn", data.get('linkedin_url')))
+        return ". ".join(f"{label}: {value}" for label, value in fields if value) + "."
+    
+    def _format_linkedin_basic_info(self, data: Dict[str, Any]) -> str:
         """Format LinkedIn basic info as readable text."""
-        parts = []
-        if data.get('full_name'):
-            parts.append(f"Name: {data['full_name']}")
-        if data.get('headline'):
-            parts.append(f"Headline: {data['headline']}")
-        if data.get('location'):
-            parts.append(f"Location: {data['location']}")
-        return ". ".join(parts) + "."
+        fields = (("Name", data.get('full_name')), ("Headline", data.get('headline')), ("Location", data.get('location')))
+        return ". ".join(f"{label}: {value}" for label, value in fields if value) + "."
     
     @staticmethod
-    def _safe_str(value) -> str:
+    def _safe_str(value: Any) -> str:
         """Safely convert any value to a string for .join() operations."""
         if isinstance(value, list):
             return ". ".join(str(item) for item in value)
         if isinstance(value, dict):
             return str(value)
         return str(value) if value else ""
-
-    def _format_work_experience(self, exp: Dict) -> str:
+    
+    def _format_work_experience(self, exp: Dict[str, Any]) -> str:
         """Format work experience as readable text."""
-        parts = []
-        
         designation = exp.get('designation', '')
         company = exp.get('company_name', '')
         start = exp.get('start_date', '')
         end = exp.get('end_date', '')
         desc = exp.get('description', '')
         
-        # Title line
-        title = f"{designation} at {company}"
-        if start and end:
-            title += f" ({start} - {end})"
-        parts.append(title)
-        
-        # Description — safely handle list or string
-        if desc:
-            parts.append(self._safe_str(desc))
-        
-        return ". ".join(parts) + "."
+        # Title line, then the description (list or string) without doubling its final period
+        return (
+            f"{designation} at {company}"
+            + (f" ({start} - {end})" if start and end else "")
+            + (f". {self._safe_str(desc).rstrip('.')}" if desc else "")
+            + "."
+        )
     
     def _format_project(self, project: Any) -> str:
         """Format project as readable text."""
         if isinstance(project, str):
             return project
-            
-        parts = []
         
         name = project.get('project_name', '')
         desc = project.get('description', '')
         
+        desc_str = self._safe_str(desc).rstrip('.') if desc else ""
         if name:
-            parts.append(f"Project: {name}")
-        if desc:
-            parts.append(self._safe_str(desc))
-        
-        return ". ".join(parts) + "."
+            return f"Project: {name}. {desc_str}." if desc_str else f"Project: {name}."
+        return f"{desc_str}."
     
-    def _format_skills(self, skills) -> str:
+    def _format_skills(self, skills: Any) -> str:
         """Format skills list as readable text."""
         safe_skills = [str(s) for s in skills] if isinstance(skills, list) else [str(skills)]
         return f"Technical Skills: {', '.join(safe_skills)}."
     
-    def _format_certifications(self, certifications) -> str:
+    def _format_certifications(self, certifications: Sequence[Any]) -> str:
         """Format certifications as readable text."""
         safe_certs = [str(c) if isinstance(c, str) else c.get('certification_name', str(c)) if isinstance(c, dict) else str(c) for c in certifications]
         return f"Certifications: {', '.join(safe_certs)}."
@@ -391,8 +299,6 @@ class StructuredChunker:
         """Format education as readable text."""
         if isinstance(edu, str):
             return edu
-            
-        parts = []
         
         degree = edu.get('degree', '')
         field = edu.get('field_of_study', '')
@@ -400,62 +306,49 @@ class StructuredChunker:
         start = edu.get('start_date', '')
         end = edu.get('end_date', '')
         
-        # Degree line
-        edu_str = f"{degree} in {field}" if field else degree
-        if institution:
-            edu_str += f" from {institution}"
-        if start and end:
-            edu_str += f" ({start} - {end})"
-        
-        parts.append(edu_str)
-        return ". ".join(parts) + "."
+        return (
+            (f"{degree} in {field}" if field else degree)
+            + (f" from {institution}" if institution else "")
+            + (f" ({start} - {end})" if start and end else "")
+            + "."
+        )
     
     def _format_certification(self, cert: Any) -> str:
         """Format certification as readable text."""
         if isinstance(cert, str):
             return cert
-            
-        parts = []
         
         name = cert.get('certification_name', '')
         org = cert.get('issuing_organization', '')
         date = cert.get('issue_date', '')
         
-        cert_str = name
-        if org:
-            cert_str += f" from {org}"
-        if date:
-            cert_str += f" (issued {date})"
-        
-        parts.append(f"Certification: {cert_str}")
-        return ". ".join(parts) + "."
+        return (
+            f"Certification: {name}"
+            + (f" from {org}" if org else "")
+            + (f" (issued {date})" if date else "")
+            + "."
+        )
     
     def _format_award(self, award: Any) -> str:
         """Format honor/award as readable text."""
         if isinstance(award, str):
             return award
-            
-        parts = []
         
         name = award.get('award_name', '')
         org = award.get('issuing_organization', '')
         date = award.get('issue_date', '')
         
-        award_str = name
-        if org:
-            award_str += f" from {org}"
-        if date:
-            award_str += f" ({date})"
-        
-        parts.append(f"Award: {award_str}")
-        return ". ".join(parts) + "."
+        return (
+            f"Award: {name}"
+            + (f" from {org}" if org else "")
+            + (f" ({date})" if date else "")
+            + "."
+        )
     
     def _format_repository(self, repo: Any) -> str:
         """Format GitHub repository as readable text."""
         if isinstance(repo, str):
             return repo
-            
-        parts = []
         
         name = repo.get('name', '') or repo.get('project_name', '')
         desc = repo.get('description', '')
@@ -463,178 +356,137 @@ class StructuredChunker:
         created = repo.get('creation_date', '')
         updated = repo.get('last_updated', '')
         
-        # Repository name and description
-        repo_str = f"GitHub Repository: {name}"
-        parts.append(repo_str)
-        
-        if desc:
-            parts.append(f"Description: {desc}")
-        
-        if languages:
-            parts.append(f"Technologies: {', '.join(languages)}")
-        
-        if created:
-            parts.append(f"Created: {created}")
-        
-        if updated:
-            parts.append(f"Last Updated: {updated}")
-        
-        return ". ".join(parts) + "."
+        return (
+            f"GitHub Repository: {name}"
+            + (f". Description: {str(desc).rstrip('.')}" if desc else "")
+            + (f". Technologies: {', '.join(languages)}" if languages else "")
+            + (f". Created: {created}" if created else "")
+            + (f". Last Updated: {updated}" if updated else "")
+            + "."
+        )
     
     # ====================================================================
     # SUMMARY FORMATTING METHODS (for hybrid chunking)
     # ====================================================================
     
-    def _format_work_experience_summary(self, experiences: List[Any]) -> str:
+    # Per-item summary lines, numbered from 1. _iter_chunks builds them in the same pass as the item chunks.
+    
+    def _work_experience_summary_line(self, i: int, exp: Any) -> str:
+        """One numbered line of the work experience summary."""
+        if isinstance(exp, str):
+            return f"{i}. {exp}"
+        return "".join((
+            f"{i}. {exp.get('designation', '')} at {exp.get('company_name', '')}",
+            f" ({exp['start_date']} - {exp['end_date']})" if exp.get('start_date') and exp.get('end_date') else "",
+            f": {self._safe_str(exp['description'])}" if exp.get('description') else "",
+        ))
+    
+    def _project_summary_line(self, i: int, project: Any) -> str:
+        """One numbered line of the projects summary."""
+        if isinstance(project, str):
+            return f"{i}. {project}"
+        return "".join((
+            f"{i}. {project.get('project_name', '') or project.get('name', '')}",
+            f": {self._safe_str(project['description'])}" if project.get('description') else "",
+        ))
+    
+    def _education_summary_line(self, i: int, edu: Any) -> str:
+        """One numbered line of the education summary."""
+        if isinstance(edu, str):
+            return f"{i}. {edu}"
+        return "".join((
+            f"{i}. {edu.get('degree', '')}",
+            f" in {edu['field_of_study']}" if edu.get('field_of_study') else "",
+            f" from {edu['institution_name']}" if edu.get('institution_name') else "",
+            f" ({edu['start_date']} - {edu['end_date']})" if edu.get('start_date') and edu.get('end_date') else "",
+        ))
+    
+    def _certification_summary_line(self, i: int, cert: Any) -> str:
+        """One numbered line of the certifications summary."""
+        if isinstance(cert, str):
+            return f"{i}. {cert}"
+        return "".join((
+            f"{i}. {cert.get('certification_name', '')}",
+            f" from {cert['issuing_organization']}" if cert.get('issuing_organization') else "",
+            f" (issued {cert['issue_date']})" if cert.get('issue_date') else "",
+        ))
+    
+    def _award_summary_line(self, i: int, award: Any) -> str:
+        """One numbered line of the honors and awards summary."""
+        if isinstance(award, str):
+            return f"{i}. {award}"
+        return "".join((
+            f"{i}. {award.get('award_name', '')}",
+            f" from {award['issuing_organization']}" if award.get('issuing_organization') else "",
+            f" ({award['issue_date']})" if award.get('issue_date') else "",
+        ))
+    
+    def _format_work_experience_summary(self, experiences: Sequence[Any], n: Optional[int] = None,
+                                        lines: Optional[Iterable[str]] = None) -> str:
         """Format all work experiences as a comprehensive summary."""
-        parts = [f"Professional Work Experience Summary ({len(experiences)} positions):"]
-        
-        for i, exp in enumerate(experiences, 1):
-            if isinstance(exp, str):
-                parts.append(f"{i}. {exp}")
-                continue
-                
-            designation = exp.get('designation', '')
-            company = exp.get('company_name', '')
-            start = exp.get('start_date', '')
-            end = exp.get('end_date', '')
-            desc = exp.get('description', '')
-            
-            exp_str = f"{i}. {designation} at {company}"
-            if start and end:
-                exp_str += f" ({start} - {end})"
-            if desc:
-                exp_str += f": {self._safe_str(desc)}"
-            
-            parts.append(exp_str)
-        
-        return " ".join(parts)
+        n = len(experiences) if n is None else n
+        if lines is None:
+            lines = map(self._work_experience_summary_line, count(1), experiences)
+        return f"Professional Work Experience Summary ({n} positions): {' '.join(lines)}"
     
-    def _format_projects_summary(self, projects: List[Any]) -> str:
+    def _format_projects_summary(self, projects: Sequence[Any], n: Optional[int] = None,
+                                 lines: Optional[Iterable[str]] = None) -> str:
         """Format all projects as a comprehensive summary."""
-        parts = [f"Projects Portfolio ({len(projects)} projects):"]
-        
-        for i, project in enumerate(projects, 1):
-            if isinstance(project, str):
-                parts.append(f"{i}. {project}")
-                continue
-                
-            name = project.get('project_name', '') or project.get('name', '')
-            desc = project.get('description', '')
-            
-            proj_str = f"{i}. {name}"
-            if desc:
-                proj_str += f": {self._safe_str(desc)}"
-            
-            parts.append(proj_str)
-        
-        parts.append(f"Total: {len(projects)} completed projects demonstrating full-stack development, AI/ML integration, and automation expertise.")
-        
-        return " ".join(parts)
+        n = len(projects) if n is None else n
+        if lines is None:
+            lines = map(self._project_summary_line, count(1), projects)
+        return (
+            f"Projects Portfolio ({n} projects): {' '.join(lines)} "
+            f"Total: {n} completed projects demonstrating full-stack development, AI/ML integration, and automation expertise."
+        )
     
-    def _format_education_summary(self, education: List[Any]) -> str:
+    def _format_education_summary(self, education: Sequence[Any], n: Optional[int] = None,
+                                  lines: Optional[Iterable[str]] = None) -> str:
         """Format all education as a comprehensive summary."""
-        parts = [f"Educational Background ({len(education)} degrees):"]
-        
-        for i, edu in enumerate(education, 1):
-            if isinstance(edu, str):
-                parts.append(f"{i}. {edu}")
-                continue
-                
-            degree = edu.get('degree', '')
-            field = edu.get('field_of_study', '')
-            institution = edu.get('institution_name', '')
-            start = edu.get('start_date', '')
-            end = edu.get('end_date', '')
-            
-            edu_str = f"{i}. {degree}"
-            if field:
-                edu_str += f" in {field}"
-            if institution:
-                edu_str += f" from {institution}"
-            if start and end:
-                edu_str += f" ({start} - {end})"
-            
-            parts.append(edu_str)
-        
-        return " ".join(parts)
+        n = len(education) if n is None else n
+        if lines is None:
+            lines = map(self._education_summary_line, count(1), education)
+        return f"Educational Background ({n} degrees): {' '.join(lines)}"
     
-    def _format_certifications_summary(self, certifications: List[Any]) -> str:
+    def _format_certifications_summary(self, certifications: Sequence[Any], n: Optional[int] = None,
+                                       lines: Optional[Iterable[str]] = None) -> str:
         """Format all certifications as a comprehensive summary."""
-        parts = [f"Professional Certifications ({len(certifications)} certifications):"]
-        
-        for i, cert in enumerate(certifications, 1):
-            if isinstance(cert, str):
-                parts.append(f"{i}. {cert}")
-                continue
-                
-            name = cert.get('certification_name', '')
-            org = cert.get('issuing_organization', '')
-            date = cert.get('issue_date', '')
-            
-            cert_str = f"{i}. {name}"
-            if org:
-                cert_str += f" from {org}"
-            if date:
-                cert_str += f" (issued {date})"
-            
-            parts.append(cert_str)
-        
-        return " ".join(parts)
+        n = len(certifications) if n is None else n
+        if lines is None:
+            lines = map(self._certification_summary_line, count(1), certifications)
+        return f"Professional Certifications ({n} certifications): {' '.join(lines)}"
     
-    def _format_awards_summary(self, awards: List[Any]) -> str:
+    def _format_awards_summary(self, awards: Sequence[Any], n: Optional[int] = None,
+                               lines: Optional[Iterable[str]] = None) -> str:
         """Format all honors and awards as a comprehensive summary."""
-        parts = [f"Honors and Awards ({len(awards)} awards):"]
-        
-        for i, award in enumerate(awards, 1):
-            if isinstance(award, str):
-                parts.append(f"{i}. {award}")
-                continue
-                
-            name = award.get('award_name', '')
-            org = award.get('issuing_organization', '')
-            date = award.get('issue_date', '')
-            
-            award_str = f"{i}. {name}"
-            if org:
-                award_str += f" from {org}"
-            if date:
-                award_str += f" ({date})"
-            
-            parts.append(award_str)
-        
-        return " ".join(parts)
+        n = len(awards) if n is None else n
+        if lines is None:
+            lines = map(self._award_summary_line, count(1), awards)
+        return f"Honors and Awards ({n} awards): {' '.join(lines)}"
     
-    def _format_repositories_summary(self, repositories: List[Any]) -> str:
+    def _format_repositories_summary(self, repositories: Sequence[Any], n: Optional[int] = None) -> str:
         """Format all GitHub repositories as a comprehensive portfolio overview."""
-        parts = [f"GitHub Portfolio Overview ({len(repositories)} repositories):"]
-        
-        # Collect all unique languages
+        n = len(repositories) if n is None else n
+        # One pass over the repos collects every language and the first 10 key projects
+        # (bare names, and repos with a description)
         all_languages = set()
-        for repo in repositories:
-            if isinstance(repo, dict):
-                langs = repo.get('languages_used', [])
-                all_languages.update(langs)
-        
-        # Highlight key projects (non-empty descriptions)
+        add_languages = all_languages.update  # Bound once; the loop calls it for every repo
         key_projects = []
         for r in repositories:
             if isinstance(r, str):
-                key_projects.append({"name": r, "description": ""})
+                if len(key_projects) < 10:
+                    key_projects.append(f"• {r}: ")
             elif isinstance(r, dict):
-                name = r.get('name', '') or r.get('project_name', '')
-                desc = r.get('description', '')
-                if desc:
-                    key_projects.append({"name": name, "description": desc})
-        
-        parts.append("Key Projects:")
-        for proj in key_projects[:10]:  # Top 10 projects with descriptions
-            parts.append(f"• {proj['name']}: {proj['description']}")
-        
-        if all_languages:
-            parts.append(f"Technologies used across portfolio: {', '.join(sorted(all_languages))}.")
-        
-        parts.append(f"Total: {len(repositories)} repositories demonstrating expertise in full-stack development, AI/ML, LLMs, RAG systems, and modern web technologies.")
-        
-        return " ".join(parts)
+                add_languages(r.get('languages_used') or ())
+                # Once 10 key projects are in, skip the description lookup and formatting entirely
+                if len(key_projects) < 10 and r.get('description'):
+                    key_projects.append(f"• {r.get('name', '') or r.get('project_name', '')}: {r['description']}")
+        
+        return " ".join((
+            f"GitHub Portfolio Overview ({n} repositories):",
+            "Key Projects:",
+            *key_projects,
+            *((f"Technologies used across portfolio: {', '.join(sorted(all_languages))}.",) if all_languages else ()),
+            f"Total: {n} repositories demonstrating expertise in full-stack development, AI/ML, LLMs, RAG systems, and modern web technologies.",
+        ))
 
@@ -1,8 +1,66 @@
 import json
+import functools
+import itertools
 import tiktoken
 from typing import List, Dict, Tuple
 import re
 
+@functools.lru_cache(maxsize=None)
+def get_encoder(model_name: str):
+    """Load the tiktoken encoder for a model once per process."""
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        # Fallback to cl100k_base encoding if model not found
+        return tiktoken.get_encoding("cl100k_base")
+
+@functools.lru_cache(maxsize=4096)
+def encode_cached(text: str, model_name: str) -> tuple:
+    """Token ids for text; repeated fragments (overlaps, headers) are encoded once."""
+    return tuple(get_encoder(model_name).encode_ordinary(text))
+
+def _section_patterns(sections):
+    """Compile each section's keywords into one case-insensitive alternation, keeping priority order.
+
+    Keywords must start at a word boundary (so 'work' no longer fires on 'network' or 'framework')
+    but may be followed by a suffix, which keeps plurals like 'skills' and 'projects' matching.
+    """
+    return [(name, re.compile(r"\b(?:" + "|".join(map(re.escape, keywords)) + ")", re.IGNORECASE))
+            for name, keywords in sections]
+
+# Checked in order; the first section with any keyword in the chunk wins
+_RESUME_SECTIONS = _section_patterns([
+    ('work_experience', ['experience', 'work', 'employment', 'career']),
+    ('education', ['education', 'degree', 'university', 'college']),
+    ('skills', ['skill', 'technology', 'programming']),
+    ('projects', ['project', 'portfolio']),
+    ('certifications', ['certification', 'certificate']),
+])
+_LINKEDIN_SECTIONS = _section_patterns([
+    ('work_experience', ['experience', 'work', 'employment']),
+    ('education', ['education', 'degree', 'university']),
+    ('skills', ['skill', 'endorsement']),
+    ('certifications', ['certification', 'license']),
+    ('honors_awards', ['award', 'honor', 'achievement']),
+])
+_GITHUB_SECTIONS = _section_patterns([
+    ('repositories', ['repository', 'repo']),
+    ('languages', ['language', 'programming']),
+    ('descriptions', ['description', 'readme']),
+])
+
+# Per-chunker sentence id cache bound; the oldest sentences are dropped first once it is full
+_SENTENCE_CACHE_SIZE = 8192
+
+# Sentence boundaries: any newline (with its surrounding whitespace), or whitespace after . ! ?
+_SENTENCE_BOUNDARY = re.compile(r'\s*\n\s*|(?<=[.!?])\s+')
+
+def _first_matching_section(patterns, text: str) -> str:
+    for name, pattern in patterns:
+        if pattern.search(text):
+            return name
+    return 'general'
+
 class SlidingWindowChunker:
     """
     A sliding window chunker that splits text into overlapping chunks of fixed token size.
@@ -25,39 +83,34 @@ class SlidingWindowChunker:
         self.overlap_size = overlap_size
         self.model_name = model_name
         
-        # Initialize tokenizer for accurate token counting
-        try:
-            self.tokenizer = tiktoken.encoding_for_model(model_name)
-        except KeyError:
-            # Fallback to cl100k_base encoding if model not found
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        # Shared tokenizer for accurate token counting, loaded once per model
+        self.tokenizer = get_encoder(model_name)
+        # Sentence -> token ids, kept across documents: bullets, headers and overlaps repeat verbatim
+        self._token_ids: Dict[str, tuple] = {}
     
     def count_tokens(self, text: str) -> int:
         """Count the number of tokens in a text string."""
-        return len(self.tokenizer.encode(text))
+        return len(encode_cached(text, self.model_name))
+    
+    def _encode_sentences(self, sentences: List[str]) -> List[tuple]:
+        """Token ids per sentence; only sentences not seen before go to the tokenizer, in one batch."""
+        token_ids = self._token_ids
+        missing = [sent for sent in dict.fromkeys(sentences) if sent not in token_ids]
+        if missing:
+            token_ids.update(zip(missing, map(tuple, self.tokenizer.encode_ordinary_batch(missing))))
+        result = [token_ids[sent] for sent in sentences]
+        # Dicts keep insertion order, so the first keys are the oldest sentences
+        for sent in list(itertools.islice(token_ids, max(0, len(token_ids) - _SENTENCE_CACHE_SIZE))):
+            del token_ids[sent]
+        return result
     
     def split_text_into_sentences(self, text: str) -> List[str]:
         """
         Split text into sentences while preserving structure.
         This helps maintain semantic boundaries in chunks.
         """
-        # First split on newlines to separate logical sections
-        lines = text.split('\n')
-        
-        sentences = []
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Further split each line on sentence boundaries (. ! ?)
-            line_sentences = re.split(r'(?<=[.!?])\s+', line)
-            for sent in line_sentences:
-                sent = sent.strip()
-                if sent:
-                    sentences.append(sent)
-        
-        return sentences
+        # Newlines separate logical sections; within a line, split after . ! ? (one C-level pass)
+        return [sent for sent in map(str.strip, _SENTENCE_BOUNDARY.split(text)) if sent]
     
     def chunk_text(self, text: str, source_type: str, metadata: Dict = None) -> List[Dict]:
         """
@@ -81,60 +134,81 @@ class SlidingWindowChunker:
         
         chunks = []
         current_chunk = []
-        current_tokens = 0
+        # Per-sentence ids plus separators: a close upper bound on the tokens of " ".join(current_chunk),
+        # used only to decide where to cut (BPE merges across the joins, so it is not the exact count)
+        current_ids = []
+        current_lens = []  # Token count of each entry in current_chunk
         chunk_index = 0
+        # Loop-invariant lookups bound once
+        chunk_size = self.chunk_size
+        overlap = self.overlap_size > 0
+        
+        # One batched encode for the sentences not seen before; packing uses these ids, and each emitted chunk
+        # is encoded once so its token_count is the real count of its text
+        sentence_ids = self._encode_sentences(sentences)
+        separator_ids = encode_cached(" ", self.model_name)
         
         # Build chunks sentence by sentence
-        for sentence in sentences:
-            sentence_tokens = self.count_tokens(sentence)
-            
+        for sentence, ids in zip(sentences, sentence_ids):
             # If adding this sentence would exceed chunk size, finalize current chunk
-            if current_tokens + sentence_tokens > self.chunk_size and current_chunk:
+            if len(current_ids) + len(ids) > chunk_size and current_chunk:
                 # Create chunk from current sentences
                 chunk_text = " ".join(current_chunk)
-                chunk_data = self._create_chunk_data(
-                    chunk_text, source_type, chunk_index, metadata
-                )
+                chunk_data = self._create_chunk_data(chunk_text, source_type, chunk_index, metadata)
                 chunks.append(chunk_data)
                 chunk_index += 1
                 
-                # Start new chunk with overlap
-                current_chunk, current_tokens = self._create_overlap_chunk(
-                    current_chunk, chunk_text
-                )
+                # Start new chunk with overlap (or empty: finalizing needs no tokenizer call either way)
+                if overlap:
+                    current_chunk, current_lens, current_ids = self._create_overlap_chunk(
+                        current_ids, current_chunk, current_lens, len(separator_ids)
+                    )
+                else:
+                    current_chunk, current_lens, current_ids = [], [], []
             
             # Add current sentence to chunk
+            if current_chunk:
+                current_ids.extend(separator_ids)
             current_chunk.append(sentence)
-            current_tokens += sentence_tokens
+            current_lens.append(len(ids))
+            current_ids.extend(ids)
         
         # Add the last chunk if it has content
         if current_chunk:
             chunk_text = " ".join(current_chunk)
-            chunk_data = self._create_chunk_data(
-                chunk_text, source_type, chunk_index, metadata
-            )
+            chunk_data = self._create_chunk_data(chunk_text, source_type, chunk_index, metadata)
             chunks.append(chunk_data)
         
         return chunks
     
-    def _create_overlap_chunk(self, previous_chunk: List[str], chunk_text: str) -> Tuple[List[str], int]:
+    def _create_overlap_chunk(self, chunk_ids: List[int], sentences: List[str], sentence_lens: List[int],
+                              separator_len: int) -> Tuple[List[str], List[int], List[int]]:
         """
         Create overlap for the next chunk by taking the last portion of the current chunk.
+        Carries the trailing whole sentences that fit in overlap_size, reusing their known ids;
+        only when even the last sentence is too long are the last overlap_size tokens decoded.
         """
         if self.overlap_size <= 0:
-            return [], 0
-        
-        # Split the chunk text into tokens for precise overlap
-        tokens = self.tokenizer.encode(chunk_text)
-        
-        # Take the last overlap_size tokens
-        overlap_tokens = tokens[-self.overlap_size:] if len(tokens) > self.overlap_size else tokens
-        overlap_text = self.tokenizer.decode(overlap_tokens)
-        
-        # Try to split at sentence boundaries within the overlap
-        overlap_sentences = self.split_text_into_sentences(overlap_text)
-        
-        return overlap_sentences, self.count_tokens(overlap_text)
+            return [], [], []
+        
+        # Walk back over whole sentences while they (and the separators between them) still fit
+        n = total = 0
+        for length in reversed(sentence_lens):
+            extra = length + separator_len if n else length
+            if total + extra > self.overlap_size:
+                break
+            total += extra
+            n += 1
+        if n:
+            return sentences[-n:], sentence_lens[-n:], chunk_ids[-total:]
+        
+        # Take the last overlap_size tokens, decoded once; the overlap is carried as a single fragment
+        overlap_ids = chunk_ids[-self.overlap_size:]
+        overlap_text = self.tokenizer.decode(overlap_ids).strip()
+        if not overlap_text:
+            return [], [], []
+        
+        return [overlap_text], [len(overlap_ids)], overlap_ids
     
     def _create_chunk_data(self, chunk_text: str, source_type: str, 
                           chunk_index: int, metadata: Dict = None) -> Dict:
@@ -161,50 +235,15 @@ class SlidingWindowChunker:
     
     def _identify_resume_section(self, text: str) -> str:
         """Identify which section of the resume this chunk belongs to."""
-        text_lower = text.lower()
-        
-        if any(keyword in text_lower for keyword in ['experience', 'work', 'employment', 'career']):
-            return 'work_experience'
-        elif any(keyword in text_lower for keyword in ['education', 'degree', 'university', 'college']):
-            return 'education'
-        elif any(keyword in text_lower for keyword in ['skill', 'technology', 'programming']):
-            return 'skills'
-        elif any(keyword in text_lower for keyword in ['project', 'portfolio']):
-            return 'projects'
-        elif any(keyword in text_lower for keyword in ['certification', 'certificate']):
-            return 'certifications'
-        else:
-            return 'general'
+        return _first_matching_section(_RESUME_SECTIONS, text)
     
     def _identify_linkedin_section(self, text: str) -> str:
         """Identify which section of the LinkedIn profile this chunk belongs to."""
-        text_lower = text.lower()
-        
-        if any(keyword in text_lower for keyword in ['experience', 'work', 'employment']):
-            return 'work_experience'
-        elif any(keyword in text_lower for keyword in ['education', 'degree', 'university']):
-            return 'education'
-        elif any(keyword in text_lower for keyword in ['skill', 'endorsement']):
-            return 'skills'
-        elif any(keyword in text_lower for keyword in ['certification', 'license']):
-            return 'certifications'
-        elif any(keyword in text_lower for keyword in ['award', 'honor', 'achievement']):
-            return 'honors_awards'
-        else:
-            return 'general'
+        return _first_matching_section(_LINKEDIN_SECTIONS, text)
     
     def _identify_github_section(self, text: str) -> str:
         """Identify which section of the GitHub data this chunk belongs to."""
-        text_lower = text.lower()
-        
-        if any(keyword in text_lower for keyword in ['repository', 'repo']):
-            return 'repositories'
-        elif any(keyword in text_lower for keyword in ['language', 'programming']):
-            return 'languages'
-        elif any(keyword in text_lower for keyword in ['description', 'readme']):
-            return 'descriptions'
-        else:
-            return 'general'
+        return _first_matching_section(_GITHUB_SECTIONS, text)
     
     def chunk_json_data(self, json_data: Dict, source_type: str) -> List[Dict]:
         """
@@ -227,7 +266,19 @@ class SlidingWindowChunker:
         }
         
         return self.chunk_text(text_data, source_type, metadata)
-    
+
+    def chunk_json_sources(self, sources: Dict[str, Dict]) -> Dict[str, List[Dict]]:
+        """
+        Chunk several sources at once (source_type -> JSON data).
+
+        Sentences from every source are tokenized in one encode_ordinary_batch call, which tiktoken
+        spreads over its own thread pool; each chunk_json_data call then hits the warm id cache.
+        """
+        texts = [self._json_to_text(json_data, source_type) for source_type, json_data in sources.items()]
+        self._encode_sentences([sent for text in texts for sent in self.split_text_into_sentences(text)])
+
+        return {source_type: self.chunk_json_data(json_data, source_type) for source_type, json_data in sources.items()}
+
     def _json_to_text(self, json_data: Dict, source_type: str) -> str:
         """
         Convert JSON data to readable text format for chunking.
@@ -257,12 +308,11 @@ class SlidingWindowChunker:
         if resume_data.get('work_experience'):
             text_parts.append("\nWork Experience:")
             for exp in resume_data['work_experience']:
-                exp_text = f"- {exp.get('designation', '')} at {exp.get('company_name', '')}"
-                if exp.get('start_date') and exp.get('end_date'):
-                    exp_text += f" ({exp['start_date']} - {exp['end_date']})"
-                if exp.get('description'):
-                    exp_text += f": {exp['description']}"
-                text_parts.append(exp_text)
+                text_parts.append("".join((
+                    f"- {exp.get('designation', '')} at {exp.get('company_name', '')}",
+                    f" ({exp['start_date']} - {exp['end_date']})" if exp.get('start_date') and exp.get('end_date') else "",
+                    f": {exp['description']}" if exp.get('description') else "",
+                )))
         
         # Skills
         if resume_data.get('skills'):
@@ -272,10 +322,10 @@ class SlidingWindowChunker:
         if resume_data.get('projects'):
             text_parts.append("\nProjects:")
             for project in resume_data['projects']:
-                proj_text = f"- {project.get('project_name', '')}"
-                if project.get('description'):
-                    proj_text += f": {project['description']}"
-                text_parts.append(proj_text)
+                text_parts.append("".join((
+                    f"- {project.get('project_name', '')}",
+                    f": {project['description']}" if project.get('description') else "",
+                )))
         
         # Certifications
         if resume_data.get('certifications'):
@@ -299,21 +349,20 @@ class SlidingWindowChunker:
         if linkedin_data.get('work_experience'):
             text_parts.append("\nWork Experience:")
             for exp in linkedin_data['work_experience']:
-                exp_text = f"- {exp.get('designation', '')} at {exp.get('company_name', '')}"
-                if exp.get('start_date') and exp.get('end_date'):
-                    exp_text += f" ({exp['start_date']} - {exp['end_date']})"
-                if exp.get('description'):
-                    exp_text += f": {exp['description']}"
-                text_parts.append(exp_text)
+                text_parts.append("".join((
+                    f"- {exp.get('designation', '')} at {exp.get('company_name', '')}",
+                    f" ({exp['start_date']} - {exp['end_date']})" if exp.get('start_date') and exp.get('end_date') else "",
+                    f": {exp['description']}" if exp.get('description') else "",
+                )))
         
         # Education
         if linkedin_data.get('education'):
             text_parts.append("\nEducation:")
             for edu in linkedin_data['education']:
-                edu_text = f"- {edu.get('degree', '')} in {edu.get('field_of_study', '')} from {edu.get('institution_name', '')}"
-                if edu.get('start_date') and edu.get('end_date'):
-                    edu_text += f" ({edu['start_date']} - {edu['end_date']})"
-                text_parts.append(edu_text)
+                text_parts.append("".join((
+                    f"- {edu.get('degree', '')} in {edu.get('field_of_study', '')} from {edu.get('institution_name', '')}",
+                    f" ({edu['start_date']} - {edu['end_date']})" if edu.get('start_date') and edu.get('end_date') else "",
+                )))
         
         # Skills
         if linkedin_data.get('skills'):
@@ -323,19 +372,19 @@ class SlidingWindowChunker:
         if linkedin_data.get('certifications'):
             text_parts.append("\nCertifications:")
             for cert in linkedin_data['certifications']:
-                cert_text = f"- {cert.get('certification_name', '')} from {cert.get('issuing_organization', '')}"
-                if cert.get('issue_date'):
-                    cert_text += f" ({cert['issue_date']})"
-                text_parts.append(cert_text)
+                text_parts.append("".join((
+                    f"- {cert.get('certification_name', '')} from {cert.get('issuing_organization', '')}",
+                    f" ({cert['issue_date']})" if cert.get('issue_date') else "",
+                )))
         
         # Honors and awards
         if linkedin_data.get('honors_and_awards'):
             text_parts.append("\nHonors and Awards:")
             for award in linkedin_data['honors_and_awards']:
-                award_text = f"- {award.get('award_name', '')} from {award.get('issuing_organization', '')}"
-                if award.get('issue_date'):
-                    award_text += f" ({award['issue_date']})"
-                text_parts.append(award_text)
+                text_parts.append("".join((
+                    f"- {award.get('award_name', '')} from {award.get('issuing_organization', '')}",
+                    f" ({award['issue_date']})" if award.get('issue_date') else "",
+                )))
         
         return "\n".join(text_parts)
     
@@ -346,15 +395,12 @@ class SlidingWindowChunker:
         if github_data.get('repositories'):
             text_parts.append("GitHub Repositories:")
             for repo in github_data['repositories']:
-                repo_text = f"- {repo.get('name', '')}"
-                if repo.get('description'):
-                    repo_text += f": {repo['description']}"
-                if repo.get('languages_used'):
-                    repo_text += f" (Languages: {', '.join(repo['languages_used'])})"
-                if repo.get('creation_date'):
-                    repo_text += f" (Created: {repo['creation_date']})"
-                if repo.get('last_updated'):
-                    repo_text += f" (Updated: {repo['last_updated']})"
-                text_parts.append(repo_text)
+                text_parts.append("".join((
+                    f"- {repo.get('name', '')}",
+                    f": {repo['description']}" if repo.get('description') else "",
+                    f" (Languages: {', '.join(repo['languages_used'])})" if repo.get('languages_used') else "",
+                    f" (Created: {repo['creation_date']})" if repo.get('creation_date') else "",
+                    f" (Updated: {repo['last_updated']})" if repo.get('last_updated') else "",
+                )))
         
         return "\n".join(text_parts)
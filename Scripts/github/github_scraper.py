@@ -1,6 +1,9 @@
 import requests
 import base64
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 def fetch_github_repositories(username):
     headers = {
@@ -34,10 +37,9 @@ def fetch_github_repositories(username):
         return repo_data
 
     except requests.exceptions.HTTPError as err:
-        print(f"HTTP error occurred: {err}")  # Print the complete error
-        print(f"Response status code: {response.status_code}")
-        print(f"Response content: {response.content}")
+        logger.error("HTTP error occurred: %s (status %s)", err, err.response.status_code if err.response is not None else "n/a")
+        logger.debug("Response content: %s", err.response.content if err.response is not None else b"")
     except Exception as err:
-        print(f"Other error occurred: {err}")
+        logger.error("Other error occurred: %s", err)
 
     return []
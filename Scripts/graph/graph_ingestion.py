@@ -3,7 +3,7 @@ import json
 import logging
 import time
 from neo4j import GraphDatabase
-from google import genai
+from pipeline.gemini_client import get_genai_client, get_gemini_rate_limit
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +27,8 @@ def extract_skills_from_text(text, all_known_skills):
     """
     
     try:
-        client = genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
+        client = get_genai_client()
+        get_gemini_rate_limit().acquire()
         response = client.models.generate_content(
             model="gemini-2.5-flash",
             contents=prompt,
@@ -35,7 +36,7 @@ def extract_skills_from_text(text, all_known_skills):
         extracted = [s.strip() for s in response.text.split(',') if s.strip()]
         return extracted
     except Exception as e:
-        logger.warning(f"Skill extraction failed: {e}")
+        logger.warning("Skill extraction failed: %s", e)
         return []
 
 def ingest_into_graph(final_data):
@@ -108,7 +109,7 @@ def ingest_into_graph(final_data):
                             skill=s_name, company=exp["company_name"], role=exp["designation"]
                         )
                     if desc_skills:
-                        logger.info(f"Extracted {len(desc_skills)} skills for {exp['designation']} at {exp['company_name']}")
+                        logger.debug("Extracted %d skills for %s at %s", len(desc_skills), exp['designation'], exp['company_name'])
 
             # 3. EDUCATION
             for edu in final_data["linkedin"].get("education", []):
@@ -265,4 +266,4 @@ def ingest_into_graph(final_data):
 
         driver.close()
     except Exception as e:
-        logger.error(f"Ingestion lifecycle failed: {e}")
+        logger.error("Ingestion lifecycle failed: %s", e)
@@ -1,7 +1,7 @@
 import os
 import logging
 from neo4j import GraphDatabase
-from google import genai
+from pipeline.gemini_client import get_genai_client, get_gemini_rate_limit
 from dotenv import load_dotenv
 
 # Setup logging
@@ -42,7 +42,7 @@ def generate_cypher(question):
     """
     Translate natural language question to Cypher using Gemini.
     """
-    client = genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
+    client = get_genai_client()
     
     prompt = f"""
     You are an expert Neo4j developer. Convert the following natural language question into a Cypher query.
@@ -60,13 +60,14 @@ def generate_cypher(question):
     Cypher:"""
 
     try:
+        get_gemini_rate_limit().acquire()
         response = client.models.generate_content(
             model="gemini-2.5-flash",
             contents=prompt,
         )
         return response.text.strip().replace('```cypher', '').replace('```', '')
     except Exception as e:
-        logger.error(f"Failed to generate Cypher: {e}")
+        logger.error("Failed to generate Cypher: %s", e)
         return None
 
 def execute_query(cypher):
@@ -86,7 +87,7 @@ def execute_query(cypher):
             result = session.run(cypher)
             return [record.data() for record in result]
     except Exception as e:
-        logger.error(f"Query execution failed: {e}")
+        logger.error("Query execution failed: %s", e)
         return []
     finally:
         driver.close()
@@ -95,14 +96,14 @@ def ask_graph(question):
     """
     Wrapper for NL2Cypher flow.
     """
-    logger.info(f"Question: {question}")
+    logger.info("Question: %s", question)
     cypher = generate_cypher(question)
     
     if not cypher:
         print("I couldn't translate that into a database query.")
         return
 
-    logger.info(f"Generated Cypher: {cypher}")
+    logger.info("Generated Cypher: %s", cypher)
     results = execute_query(cypher)
     
     if not results:
@@ -119,4 +120,4 @@ if __name__ == "__main__":
         query = " ".join(sys.argv[1:])
         ask_graph(query)
     else:
-        print("Usage: python graph_query.py \"Your question here\"")
+        print("Usage (from Scripts/): python -m graph.graph_query \"Your question here\"")
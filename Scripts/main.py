@@ -4,15 +4,15 @@ from dotenv import load_dotenv
 from pipeline.scraping_phase import run_scraping_phase
 from pipeline.ingestion_phase import run_ingestion_phase
 
-# Setup professional logging
+load_dotenv()
+
+# Setup professional logging; LOG_LEVEL=DEBUG adds per-item detail, WARNING keeps only problems
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-
 def main():
     logger.info("🚀 Portfolio RAG Pipeline Starting...")
     
@@ -20,14 +20,14 @@ def main():
     try:
         final_data = run_scraping_phase()
     except Exception as e:
-        logger.error(f"Scraping stage failed: {e}")
+        logger.error("Scraping stage failed: %s", e)
         return
 
     # Phase 2: Ingestion (Vector + Graph)
     try:
         run_ingestion_phase(final_data)
     except Exception as e:
-        logger.error(f"Ingestion stage failed: {e}")
+        logger.error("Ingestion stage failed: %s", e)
         return
 
     logger.info("🎉 Pipeline completed successfully!")
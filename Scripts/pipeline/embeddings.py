@@ -1,9 +1,36 @@
 import os
+import base64
+import hashlib
+import time
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 import openai
 import logging
+from cachelib import FileSystemCache
 
 logger = logging.getLogger(__name__)
 
+MODEL = "nomic-ai/nomic-embed-text-v1.5"
+
+# Scripts/, so the cache lands in the same place whatever directory the pipeline is started from
+_SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@functools.lru_cache(maxsize=None)
+def get_embedding_cache():
+    """Disk cache of embeddings, created on first use; persists across ingestion runs, so unchanged chunks are never re-embedded.
+
+    EMBEDDING_CACHE_DIR overrides the location; a relative path is resolved against the Scripts directory.
+    """
+    path = os.path.join(_SCRIPTS_DIR, os.getenv('EMBEDDING_CACHE_DIR', '.embed_cache'))
+    return FileSystemCache(path, threshold=0, default_timeout=0)
+
+def _as_float32(embedding):
+    """Embedding as a float32 array. Base64 payloads are the raw float32 bytes, so they are wrapped, not parsed."""
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+    return np.asarray(embedding, dtype=np.float32)
+
 class FireworksEmbeddings:
     def __init__(self):
         api_key = os.getenv('FIREWORKS_API_KEY')
@@ -14,18 +41,84 @@ class FireworksEmbeddings:
             api_key=api_key,
             base_url="https://api.fireworks.ai/inference/v1"
         )
+        self.api_calls = 0  # Cache misses only; callers rate-limit on this
+        # Matryoshka truncation, shared with the backend's query embedder: corpus, index and queries must match
+        dimensions = os.getenv('EMBEDDING_DIMENSIONS')
+        self.dimensions = int(dimensions) if dimensions else None
+        self._request_kwargs = {"dimensions": self.dimensions} if self.dimensions else {}
+        # Full-size keys keep their original form, so existing cache entries stay valid
+        self._model_key = f"{MODEL}:{self.dimensions}" if self.dimensions else MODEL
 
     def generate_embeddings(self, text):
-        """Generate embeddings using nomic-ai/nomic-embed-text-v1.5."""
+        """Generate a float32 embedding using nomic-ai/nomic-embed-text-v1.5, served from the disk cache when possible."""
         if not text:
             return []
+
+        key = hashlib.sha256(f"{self._model_key}\0{text}".encode()).hexdigest()
+        cached = get_embedding_cache().get(key)
+        if cached is not None:
+            return cached
             
         try:
+            self.api_calls += 1
             response = self.client.embeddings.create(
-                model="nomic-ai/nomic-embed-text-v1.5",
-                input=text
+                model=MODEL,
+                input=text,
+                encoding_format="base64",
+                **self._request_kwargs
             )
-            return response.data[0].embedding
+            embedding = _as_float32(response.data[0].embedding)
         except Exception as e:
-            logger.error(f"Fireworks embedding failed: {e}")
+            logger.error("Fireworks embedding failed: %s", e)
             return []
+        get_embedding_cache().set(key, embedding)
+        return embedding
+
+    def _embed_request(self, batch_texts):
+        """One embeddings API request for a list of texts."""
+        return self.client.embeddings.create(
+            model=MODEL, input=batch_texts, encoding_format="base64", **self._request_kwargs
+        ).data
+
+    def generate_embeddings_batch(self, texts, batch_size=128, delay=0, concurrency=1):
+        """Embed many texts (float32 arrays) with one API request per batch of cache misses.
+
+        Up to `concurrency` batch requests are in flight at once; request starts are spaced `delay` apart.
+        """
+        cache = get_embedding_cache()
+        embeddings = [[] for _ in texts]
+        keys = [hashlib.sha256(f"{self._model_key}\0{text}".encode()).hexdigest() for text in texts]
+        misses = []
+        for i, (text, key) in enumerate(zip(texts, keys)):
+            cached = cache.get(key) if text else None
+            if cached is not None:
+                embeddings[i] = cached
+            elif text:
+                misses.append(i)
+
+        batches = [misses[start:start + batch_size] for start in range(0, len(misses), batch_size)]
+        done = 0
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = {}
+            for n, batch in enumerate(batches):
+                if n and delay:
+                    time.sleep(delay)
+                self.api_calls += 1
+                futures[pool.submit(self._embed_request, [texts[i] for i in batch])] = batch
+
+            # Results land by index, so batches are handled (and progress logged once each) as they finish
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logger.error("Fireworks batch embedding failed: %s", e)
+                    continue
+                for item in data:
+                    i = batch[item.index]
+                    embeddings[i] = _as_float32(item.embedding)
+                    cache.set(keys[i], embeddings[i])
+                done += len(batch)
+                logger.info("Progress: %d/%d uncached chunks embedded...", done, len(misses))
+
+        return embeddings
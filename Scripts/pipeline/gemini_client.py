@@ -0,0 +1,38 @@
+import os
+import time
+import functools
+from google import genai
+
+@functools.lru_cache(maxsize=None)
+def get_genai_client():
+    """Create the Gemini client once per process, so every call reuses its HTTP connection pool."""
+    return genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
+
+class TokenBucket:
+    """Allow short bursts up to `capacity`, then pace requests at `refill_per_sec`."""
+
+    def __init__(self, capacity=10, refill_per_sec=10 / 60):
+        self.capacity = capacity
+        self.rate = refill_per_sec
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+
+    def acquire(self):
+        """Take one token, sleeping only when the bucket is empty."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        if self.tokens < 1:
+            time.sleep((1 - self.tokens) / self.rate)
+            self.last_refill = time.monotonic()
+            self.tokens = 1
+        self.tokens -= 1
+
+@functools.lru_cache(maxsize=None)
+def get_gemini_rate_limit():
+    """One bucket for every Gemini call in the pipeline (formatting, skill extraction, Cypher generation).
+
+    A fresh run starts with a full minute's quota, so the first GEMINI_RPM calls never wait.
+    """
+    rpm = int(os.getenv('GEMINI_RPM', '10'))
+    return TokenBucket(capacity=rpm, refill_per_sec=rpm / 60)
@@ -1,14 +1,103 @@
 import os
 import json
 import logging
-import time
-from pymongo import MongoClient
+import functools
+from urllib.parse import quote_plus
+import numpy as np
+from pymongo import MongoClient, ReplaceOne
+from pymongo.operations import SearchIndexModel
+from bson.binary import Binary, BinaryVectorDtype
 from chunking.structured_chunker import StructuredChunker
+from chunking.chunking_config import get_chunking_config
 from graph.graph_ingestion import ingest_into_graph
 from pipeline.embeddings import FireworksEmbeddings
 
 logger = logging.getLogger(__name__)
 
+_MONGO_ENV = ('MONGO_USERNAME', 'MONGO_PASSWORD', 'MONGO_APP_NAME', 'MONGO_DB_NAME', 'MONGO_CL_NAME')
+
+@functools.lru_cache(maxsize=None)
+def get_mongo_client():
+    """One pooled MongoDB client per process; building it resolves the SRV record and starts server discovery.
+
+    The environment is read and checked here, once, after main() has loaded .env.
+    """
+    missing = [name for name in _MONGO_ENV if not os.getenv(name)]
+    if missing:
+        raise RuntimeError(f"missing {', '.join(missing)}")
+    # Credentials are URL-quoted so passwords with '@', ':' or '/' still parse
+    user, password = quote_plus(os.getenv('MONGO_USERNAME')), quote_plus(os.getenv('MONGO_PASSWORD'))
+    mongo_uri = f"mongodb+srv://{user}:{password}@{os.getenv('MONGO_APP_NAME')}.mongodb.net/?retryWrites=true&w=majority"
+    # Embedding payloads are large float arrays; compress them on the wire (zlib if zstandard is missing)
+    return MongoClient(mongo_uri, compressors="zstd,zlib", maxPoolSize=10, maxIdleTimeMS=30000)
+
+def _ensure_vector_index(collection, num_dimensions):
+    """Create the Atlas Vector Search (HNSW) index the backend queries, unless it already exists.
+
+    Same definition as the Backend README: cosine, scalar quantization, source_type/section filters.
+    An existing index is left alone, but a numDimensions mismatch with the corpus is reported.
+    """
+    name = os.getenv('MONGO_INDEX_NAME')
+    if not name:
+        return
+    existing = next(iter(collection.list_search_indexes(name)), None)
+    if existing is not None:
+        fields = (existing.get("latestDefinition") or {}).get("fields", [])
+        indexed = next((field.get("numDimensions") for field in fields if field.get("type") == "vector"), None)
+        if indexed not in (None, num_dimensions):
+            logger.warning(
+                "Vector search index '%s' has %s dimensions but the corpus has %s; "
+                "drop the index (it is recreated on the next run) or match EMBEDDING_DIMENSIONS.",
+                name, indexed, num_dimensions,
+            )
+        return
+    collection.create_search_index(SearchIndexModel(
+        definition={
+            "fields": [
+                {
+                    "type": "vector",
+                    "path": "embedding",
+                    "numDimensions": num_dimensions,
+                    "similarity": "cosine",
+                    "quantization": "scalar"
+                },
+                {"type": "filter", "path": "source_type"},
+                {"type": "filter", "path": "section"}
+            ]
+        },
+        name=name,
+        type="vectorSearch",
+    ))
+    logger.info("Created vector search index '%s' (%s dimensions).", name, num_dimensions)
+
+def _chunk_id(chunk):
+    """Stable document id: chunk types are unique per source, item chunks add their index."""
+    if chunk.item_index is None:
+        return chunk.chunk_type
+    return f"{chunk.chunk_type}:{chunk.item_index}"
+
+def _as_vectors(embeddings):
+    """Pack embeddings as L2-normalized BSON float32 vectors (4 bytes per value instead of a tagged double).
+
+    The non-empty embeddings are copied once into a preallocated matrix and normalized together; each row
+    is then packed as one vector. Stored vectors are unit-norm, so a dotProduct index scores exactly like cosine.
+    """
+    vectors = [[] for _ in embeddings]
+    rows = [i for i, embedding in enumerate(embeddings) if len(embedding)]
+    if not rows:
+        return vectors
+    
+    matrix = np.empty((len(rows), len(embeddings[rows[0]])), dtype="<f4")
+    for r, i in enumerate(rows):
+        matrix[r] = embeddings[i]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+    
+    for r, i in enumerate(rows):
+        vectors[i] = Binary.from_vector(matrix[r], BinaryVectorDtype.FLOAT32)
+    return vectors
+
 def run_ingestion_phase(final_data):
     """
     Step-by-step ingestion into Vector DB (MongoDB) and Graph DB (Neo4j).
@@ -22,31 +111,55 @@ def run_ingestion_phase(final_data):
     github_chunks = chunker.chunk_github(final_data["github"])
     
     all_chunks = resume_chunks + linkedin_chunks + github_chunks
-    logger.info(f"Created {len(all_chunks)} semantic chunks. Generating embeddings...")
+    logger.info("Created %s semantic chunks. Generating embeddings...", len(all_chunks))
 
     # 2. Embedding & Vector Storage (MongoDB)
+    # Connect first: discovery and the TLS handshake run in pymongo's background threads while the embeddings are fetched
+    try:
+        collection = get_mongo_client()[os.getenv('MONGO_DB_NAME')][os.getenv('MONGO_CL_NAME')]
+    except Exception as e:
+        logger.error("MongoDB connection failed: %s", e)
+        collection = None
+
+    # One request per batch instead of per chunk; a few batches run concurrently, with paced starts
+    config = get_chunking_config()
     embedder = FireworksEmbeddings()
-    for i, chunk in enumerate(all_chunks):
-        if (i + 1) % 5 == 0:
-            logger.info(f"Progress: {i+1}/{len(all_chunks)} chunks embedded...")
-            time.sleep(1) # Subtle rate limiting
-        
-        embedding = embedder.generate_embeddings(chunk["chunk_text"])
-        chunk["embedding"] = embedding
+    embeddings = embedder.generate_embeddings_batch(
+        [chunk.chunk_text for chunk in all_chunks],
+        batch_size=config.embedding_batch_size,
+        delay=config.embedding_delay,
+        concurrency=config.embedding_concurrency,
+    )
+    # Chunks whose batch failed keep their stored document (and vector) rather than being overwritten with []
+    documents = [
+        {"_id": _chunk_id(chunk), **chunk.to_dict(), "embedding": vector}
+        for chunk, vector in zip(all_chunks, _as_vectors(embeddings)) if vector
+    ]
+    if len(documents) < len(all_chunks):
+        logger.warning("%d chunks have no embedding; their stored versions are kept.", len(all_chunks) - len(documents))
     
-    mongo_uri = f"mongodb+srv://{os.getenv('MONGO_USERNAME')}:{os.getenv('MONGO_PASSWORD')}@{os.getenv('MONGO_APP_NAME')}.mongodb.net/?retryWrites=true&w=majority"
-    try:
-        client = MongoClient(mongo_uri)
-        db = client[os.getenv('MONGO_DB_NAME')]
-        collection = db[os.getenv('MONGO_CL_NAME')]
+    if collection is not None:
+        try:
+            # Upsert in place, then drop chunks that no longer exist, so the collection is never empty mid-run
+            if documents:
+                collection.bulk_write(
+                    [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in documents],
+                    ordered=False,
+                )
+            # Every current chunk id is kept, including failed ones, so only chunks gone from the sources are deleted
+            collection.delete_many({"_id": {"$nin": [_chunk_id(chunk) for chunk in all_chunks]}})
+            logger.info("Successfully updated MongoDB Vector Store with %s chunks.", len(documents))
+        except Exception as e:
+            logger.error("MongoDB ingestion failed: %s", e)
         
-        # Clear existing and insert new
-        collection.delete_many({})
-        if all_chunks:
-            collection.insert_many(all_chunks)
-        logger.info(f"Successfully updated MongoDB Vector Store with {len(all_chunks)} chunks.")
-    except Exception as e:
-        logger.error(f"MongoDB ingestion failed: {e}")
+        # Without the index every $vectorSearch would fail; build it on first ingestion (Atlas builds asynchronously).
+        # Sized from EMBEDDING_DIMENSIONS, the same setting the embedder and the backend's query embedder use.
+        num_dimensions = embedder.dimensions or next((len(embedding) for embedding in embeddings if len(embedding)), 0)
+        if num_dimensions:
+            try:
+                _ensure_vector_index(collection, num_dimensions)
+            except Exception as e:
+                logger.warning("Could not create the vector search index: %s", e)
 
     # 3. Graph Storage (Neo4j)
     ingest_into_graph(final_data)
@@ -1,19 +1,44 @@
 import os
-import time
 import json
+import hashlib
 import logging
-from google import genai
+import functools
+from cachelib import FileSystemCache
+from pipeline.gemini_client import get_genai_client, get_gemini_rate_limit
 from github.github_scraper import fetch_github_repositories
 from linkedin.linkedin_scraper import scrape_linkedin_profile
 from resume.resume_parser import extract_resume_data
 
+try:
+    import orjson
+    _dump_backup = lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:  # orjson is optional; stdlib json writes the same backup, just slower
+    _dump_backup = lambda obj: json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
 logger = logging.getLogger(__name__)
 
+# Compact JSON for prompts: the default ", " / ": " separators only add whitespace tokens
+_COMPACT = (',', ':')
+
+GEMINI_MODEL = "gemini-2.5-flash"
+# Scripts/, so the cache lands in the same place whatever directory the pipeline is started from
+_SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@functools.lru_cache(maxsize=None)
+def get_format_cache():
+    """Formatted output per (model, prompt, raw data) hash, created on first use (after main() has loaded .env).
+
+    An unchanged source skips its Gemini call. FORMAT_CACHE_DIR overrides the location; a relative path
+    is resolved against the Scripts directory.
+    """
+    path = os.path.join(_SCRIPTS_DIR, os.getenv('FORMAT_CACHE_DIR', '.format_cache'))
+    return FileSystemCache(path, threshold=0, default_timeout=0)
+
 def format_with_gemini(data, prompt_type):
     """
     Generalized Gemini formatting function.
     """
-    client = genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
+    client = get_genai_client()
     
     prompts = {
         "resume": "Format this resume text into a structured JSON with keys: Name, email, phone, location, linkedin_url, github_url, portfolio_url, summary, work_experience (list of objects with company_name, designation, location, start_date, end_date, description), education (list), projects (list), skills (list).",
@@ -21,17 +46,27 @@ def format_with_gemini(data, prompt_type):
         "github": "Given this list of GitHub repositories and their readmes, extract a structured JSON focusing on project names, descriptions, and primary technologies used for each."
     }
 
+    contents = f"{prompts[prompt_type]}\n\nDATA:\n{data}"
+    key = hashlib.blake2b(f"{GEMINI_MODEL}\0{contents}".encode(), digest_size=20).hexdigest()
+    cached = get_format_cache().get(key)
+    if cached is not None:
+        logger.info("Source unchanged, reusing cached %s formatting.", prompt_type)
+        return cached
+
     try:
+        get_gemini_rate_limit().acquire()
         response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=f"{prompts[prompt_type]}\n\nDATA:\n{data}",
+            model=GEMINI_MODEL,
+            contents=contents,
         )
         # Clean up potential markdown
         json_str = response.text.strip().replace('```json', '').replace('```', '')
-        return json.loads(json_str)
+        formatted = json.loads(json_str)
     except Exception as e:
-        logger.error(f"Gemini formatting failed for {prompt_type}: {e}")
+        logger.error("Gemini formatting failed for %s: %s", prompt_type, e)
         return {}
+    get_format_cache().set(key, formatted)
+    return formatted
 
 def run_scraping_phase():
     """
@@ -50,13 +85,13 @@ def run_scraping_phase():
         "Name": os.getenv('USER_NAME'),
         "email": os.getenv('USER_EMAIL'),
         "resume": format_with_gemini(resume_text, "resume"),
-        "linkedin": format_with_gemini(json.dumps(linkedin_raw), "linkedin"),
-        "github": {"repositories": format_with_gemini(json.dumps(github_raw), "github")}
+        "linkedin": format_with_gemini(json.dumps(linkedin_raw, separators=_COMPACT), "linkedin"),
+        "github": {"repositories": format_with_gemini(json.dumps(github_raw, separators=_COMPACT), "github")}
     }
     
     # Save backup
-    with open('final_data.json', 'w') as f:
-        json.dump(final_data, f, indent=4)
+    with open('final_data.json', 'wb') as f:
+        f.write(_dump_backup(final_data))
     
     logger.info("Phase 1 completed. final_data.json updated.")
     return final_data